@@ -9,7 +9,8 @@ function [cameraParams, imagesUsed, estimationErrors] = calibrate_camera(imageFi
 %   Inputs:
 %       imageFileNames - A cell array of strings or a string array, where each
 %                        element is the path to an image file containing a
-%                        checkerboard pattern viewable by the camera.
+%                        checkerboard pattern viewable by the camera, or an
+%                        imageDatastore of the images (see capture_datastore).
 %       squareSize - A scalar value specifying the size of each square in the
 %                    checkerboard pattern, typically in millimeters or inches.
 %
@@ -33,6 +34,17 @@ function [cameraParams, imagesUsed, estimationErrors] = calibrate_camera(imageFi
 %       that the images cover a wide range of views. Good practice involves capturing
 %       images from different angles and distances.
 
+    % Images that imread can not read (.npy captures) are read with the ReadFcn of their datastore
+    if isa(imageFileNames, 'matlab.io.datastore.ImageDatastore')
+        [~, ~, extension] = fileparts(imageFileNames.Files{1});
+        if strcmpi(extension, '.npy')
+            images = readall(imageFileNames);
+            imageFileNames = cat(4, images{:});
+        else
+            imageFileNames = imageFileNames.Files;
+        end
+    end
+
     % Detect checkerboard corners in the images
     [imagePoints, boardSize] = detectCheckerboardPoints(imageFileNames);
     
@@ -42,8 +54,12 @@ function [cameraParams, imagesUsed, estimationErrors] = calibrate_camera(imageFi
     worldPoints = worldPoints - max(worldPoints) / 2;
     
     % Calibrate the camera
-    I = imread(imageFileNames{1}); % Read the first image to get its size
-    imageSize = [size(I, 1), size(I, 2)]; % [height, width]
+    if isnumeric(imageFileNames)
+        imageSize = [size(imageFileNames, 1), size(imageFileNames, 2)]; % [height, width]
+    else
+        I = imread(imageFileNames{1}); % Read the first image to get its size
+        imageSize = [size(I, 1), size(I, 2)]; % [height, width]
+    end
     
     % Estimate camera parameters
     [cameraParams, imagesUsed, estimationErrors] = estimateCameraParameters(imagePoints, worldPoints, 'ImageSize', imageSize);
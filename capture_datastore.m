@@ -0,0 +1,26 @@
+function images = capture_datastore(path, metadataPath)
+%CAPTURE_DATASTORE Creates an image datastore of captured images in the format of the capture.
+%   The capture scripts record the codec of the images (png, tiff, bmp or npy, see
+%   image_codec.py) in metadata.json in the root folder of the scan or calibration.
+%   Arrays (.npy) are read with read_npy, the other formats with imread.
+%
+%   Inputs:
+%       path - A string specifying the folder of the images.
+%       metadataPath - (Optional) Path of metadata.json. Folders without metadata
+%                      are read like imageDatastore(path).
+%
+%   Outputs:
+%       images - An imageDatastore object of the images.
+
+    if nargin < 2 || ~isfile(metadataPath)
+        images = imageDatastore(path);
+        return;
+    end
+
+    metadata = jsondecode(fileread(metadataPath));
+    if strcmp(metadata.extension, ".npy")
+        images = imageDatastore(path, "FileExtensions", ".npy", "ReadFcn", @read_npy);
+    else
+        images = imageDatastore(path, "FileExtensions", metadata.extension);
+    end
+end
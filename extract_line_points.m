@@ -1,8 +1,9 @@
-function points = extract_line_points(imagePath, roi, maxLineWidth, contrastLow, contrastHigh)
+function points = extract_line_points(imagePath, roi, maxLineWidth, contrastLow, contrastHigh, backend)
 %EXTRACT_LINE_POINTS Extracts line points from an image using Python.
 %   This function interfaces with a Python script to extract points forming lines within an image.
 %   It allows for the specification of a region of interest (ROI), maximum line width, and contrast thresholds.
-%   The Python script is expected to return coordinates of points in the detected lines.
+%   The Python script is expected to return a 2xN array with the row and column coordinates
+%   of the points in the detected lines.
 %
 %   Inputs:
 %       imagePath - A string specifying the path to the image file.
@@ -10,10 +11,16 @@ function points = extract_line_points(imagePath, roi, maxLineWidth, contrastLow,
 %       maxLineWidth - A scalar specifying the maximum width of the lines to be detected.
 %       contrastLow - A scalar defining the lower threshold for contrast filtering.
 %       contrastHigh - A scalar defining the upper threshold for contrast filtering.
+%       backend - (Optional) Line extraction backend of line_extraction.py ("halcon", "steger" or
+%                 "scanline"). Defaults to "auto" (HALCON if it is installed, Steger otherwise).
 %
 %   Output:
 %       points - An Nx2 array of [x, y] coordinates of points in the detected lines.
 
+    if nargin < 6 || isempty(backend)
+        backend = "auto";
+    end
+
     % Set Python environment
     pyenv(Version="C:\Users\Robin\anaconda3\envs\Laser\python.exe");
     
@@ -27,16 +34,13 @@ function points = extract_line_points(imagePath, roi, maxLineWidth, contrastLow,
                          max_line_width=maxLineWidth, ...
                          contrast_low=contrastLow, ...
                          contrast_high=contrastHigh, ...
-                         light_dark='light');
-    
-    % Convert Python list to MATLAB cell arrays
-    cellPointsX = cell(pyPoints{2});
-    cellPointsY = cell(pyPoints{1});
+                         light_dark='light', ...
+                         backend=backend, ...
+                         module_dir=fullfile(fileparts(pathPyFile), "pyhton", "line_extraction"));
     
-    % Convert cells to MATLAB arrays
-    pointsX = cellfun(@double, cellPointsX);
-    pointsY = cellfun(@double, cellPointsY);
+    % Convert the 2xN NumPy array (rows first, columns second) in one step
+    pointsRowCol = double(pyPoints);
     
     % Combine x and y coordinates
-    points = [pointsX', pointsY'];
+    points = [pointsRowCol(2,:)', pointsRowCol(1,:)'];
 end
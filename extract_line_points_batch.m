@@ -0,0 +1,72 @@
+function [points, attributes] = extract_line_points_batch(imagePaths, roi, maxLineWidth, contrastLow, contrastHigh, workers, cacheDir, backend)
+%EXTRACT_LINE_POINTS_BATCH Extracts line points of many images with one call into Python.
+%   This function passes all image paths to the Python binding at once, so the binding is
+%   executed and its results are converted only once per scan instead of once per image.
+%
+%   Inputs:
+%       imagePaths - A cell array or string array of image paths.
+%       roi - A four-element vector [row1, col1, row2, col2] defining the region of interest.
+%       maxLineWidth - A scalar specifying the maximum width of the lines to be detected.
+%       contrastLow - A scalar defining the lower threshold for contrast filtering.
+%       contrastHigh - A scalar defining the upper threshold for contrast filtering.
+%       workers - (Optional) Number of images extracted in parallel. Defaults to 1.
+%       cacheDir - (Optional) Folder of the result cache. Images that were already extracted with
+%                  the same parameters are loaded from the cache instead. Defaults to "" (no cache).
+%       backend - (Optional) Line extraction backend of line_extraction.py ("halcon", "steger" or
+%                 "scanline"). Defaults to "auto" (HALCON if it is installed, Steger otherwise).
+%
+%   Outputs:
+%       points - A cell array with an Nx2 array of [x, y] coordinates for every image.
+%       attributes - (Optional) A cell array with an Nx3 single array of [width, contrast, angle]
+%                    of every point for every image, as computed by the extraction backend.
+
+    if nargin < 6 || isempty(workers)
+        workers = 1;
+    end
+    if nargin < 7
+        cacheDir = "";
+    end
+    if nargin < 8 || isempty(backend)
+        backend = "auto";
+    end
+
+    % Set Python environment
+    pyenv(Version="C:\Users\Robin\anaconda3\envs\Laser\python.exe");
+    
+    % Path to the Python file for line extraction
+    pathPyFile = "C:\Users\Robin\OneDrive\University\Master\Masterarbeit\IndiPrint\scanner\laser\matlab\matlab_line_extraction_binding.py";
+    
+    % Run the Python script once for all images
+    [pyPoints, pyOffsets, pyAttributes] = pyrunfile(pathPyFile, ["points_batch", "offsets_batch", "attributes_batch"], ...
+                                      paths=cellstr(imagePaths), ...
+                                      roi=roi, ...
+                                      max_line_width=maxLineWidth, ...
+                                      contrast_low=contrastLow, ...
+                                      contrast_high=contrastHigh, ...
+                                      light_dark='light', ...
+                                      workers=int32(workers), ...
+                                      cache_dir=cacheDir, ...
+                                      backend=backend, ...
+                                      module_dir=fullfile(fileparts(pathPyFile), "pyhton", "line_extraction"));
+    
+    % Convert the 2xN NumPy array (rows first, columns second) and the offsets in one step each
+    pointsRowCol = double(pyPoints);
+    offsets = double(pyOffsets);
+
+    % The attributes are only converted if they are requested
+    if nargout > 1
+        attributesAll = single(pyAttributes);
+    end
+
+    % Split the points into the images, image i owns the columns offsets(i)+1 to offsets(i+1)
+    nImages = length(offsets) - 1;
+    points = cell(nImages, 1);
+    attributes = cell(nImages, 1);
+    for i = 1:nImages
+        columns = offsets(i)+1:offsets(i+1);
+        points{i} = [pointsRowCol(2,columns)', pointsRowCol(1,columns)'];
+        if nargout > 1
+            attributes{i} = attributesAll(:,columns)';
+        end
+    end
+end
@@ -1,14 +1,28 @@
-import halcon as ha  # Import the HALCON library for advanced image processing
-import math  # Import the math library for mathematical operations
-import cv2 as cv  # Import OpenCV for image handling and visualization
 import os # Import the os library for file and directory operations
+import sys # Import sys to find the modules of the line extraction
 import glob # Import the glob library for file and directory operations
 import csv # Import the csv library for reading and writing CSV files
+import numpy as np # Import NumPy to hand the points to MATLAB as one array
+from concurrent.futures import ThreadPoolExecutor # Import a thread pool for the batch extraction
 
-# Function to extract points along lines within a specified region of interest from an image
-def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light') -> list:
+# Attributes of the line points returned per point, one row each in the attribute array
+ATTRIBUTES = ('width', 'contrast', 'angle')
+
+# MATLAB passes the folder of the line extraction modules (pyhton/line_extraction), the binding extracts with their
+# backends (HALCON if it is installed, the NumPy implementation of Steger otherwise) and shares their result cache
+if str(module_dir) not in sys.path:
+    sys.path.append(str(module_dir))
+from line_extraction import extractCached, rowColArray
+
+# Function to convert the attributes of the line points into one array with a row per attribute
+def attributeArray(lines) -> np.ndarray:
+    return np.ascontiguousarray(np.stack((lines.width, lines.amplitude, lines.angle)), dtype=np.float32)
+
+# Function to extract points along lines and their attributes within a specified region of interest from an image
+def extractLinePointsWithAttributes(path: str, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light', backend: str = 'auto', cache=None) -> tuple:
     """
-    Extracts points along lines within a specified region of interest from an image.
+    Extracts points along lines within a specified region of interest from an image together with the
+    width, contrast and normal angle of every point.
 
     Parameters:
         path (str): Path to the image file.
@@ -17,47 +31,73 @@ def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: i
         contrast_low (int): Lower threshold for line contrast.
         contrast_high (int): Upper threshold for line contrast.
         light_dark (str, optional): Specifies if lines are lighter ('light') or darker ('dark') than the background. Defaults to 'light'.
+        backend (str, optional): Line extraction backend, see line_extraction.getBackend. Defaults to 'auto'.
+        cache (ExtractionCache, optional): Cache of the results (extraction_cache.py), shared with line_extraction.py
+            and the extraction server, see line_extraction.extractCached. Defaults to None.
 
     Returns:
-        list: A list containing two lists, the first for x-coordinates and the second for y-coordinates of the line points.
+        tuple: A contiguous 2 x N float64 array, the first row holds the row (y) and the second the column (x) coordinates of the line points,
+               and a contiguous 3 x N float32 array with the width, contrast and angle of every point (see ATTRIBUTES).
     """
-    # Calculate necessary parameters for line extraction based on inputs
-    half_width = max_line_width / 2.0
-    sigma = half_width / math.sqrt(3.0)
-    help = -2.0 * half_width / (math.sqrt(6.283185307178) * math.pow(sigma,3.0)) * math.exp(-0.5 * pow(half_width / sigma,2.0))
-    high = math.fabs(contrast_high * help)
-    low = math.fabs(contrast_low * help)
-
-    # Read the image and crop to the specified region of interest
-    img = ha.read_image(path)
-    img_roi = ha.crop_rectangle1(img, roi[0], roi[1], roi[2], roi[3])
-
-    # Parameters for line extraction
-    extract_width = "true"
-    line_model = 'bar-shaped'
-    complete_junctions = 'false'
-    
-    # Extract lines within the ROI based on specified parameters
-    lines = ha.lines_gauss(img_roi, sigma, low, high, light_dark, extract_width, line_model, complete_junctions)
-
-    # Select lines based on their length
-    longLines = ha.select_contours_xld(lines, 'contour_length', 15, 5000, 0, 0)
-
-    # Initialize lists to store coordinates of extracted line points
-    x = []
-    y  = []
-
-    # Iterate over extracted lines to collect their point coordinates
-    for i in range(len(longLines)):
-        new_points = ha.get_contour_xld(longLines[i])
-        x.extend(new_points[0])
-        y.extend(new_points[1])
-
-    # Adjust points' coordinates based on the ROI's offset
-    row = [x[i] + roi[0] for i in range(len(x))]
-    col = [y[i] + roi[1] for i in range(len(y))]
-    points = [row, col]
+    lines = extractCached(str(path), roi, max_line_width, contrast_low, contrast_high, light_dark, backend, cache=cache)
+    return rowColArray(lines), attributeArray(lines)
+
+# Function to extract points along lines within a specified region of interest from an image
+def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light', backend: str = 'auto') -> np.ndarray:
+    """
+    Extracts points along lines within a specified region of interest from an image.
+
+    Parameters:
+        path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLinePointsWithAttributes.
 
+    Returns:
+        np.ndarray: A contiguous 2 x N float64 array, the first row holds the row (y) and the second the column (x) coordinates of the line points.
+    """
+    points, attributes = extractLinePointsWithAttributes(path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend)
     return points
 
-points = extractLinePoints(path, roi, max_line_width, contrast_low, contrast_high, light_dark) 
\ No newline at end of file
+# Function to extract the points of many images with one call from MATLAB
+def extractLinePointsBatch(paths: list, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light', workers: int = 1, cache=None, backend: str = 'auto') -> tuple:
+    """
+    Extracts the line points of a list of images.
+
+    Parameters:
+        paths (list): Paths to the image files.
+        roi, max_line_width, contrast_low, contrast_high, light_dark: See extractLinePoints.
+        workers (int, optional): Number of threads extracting images in parallel. Defaults to 1.
+        cache (ExtractionCache, optional): Cache of the results, unchanged images are not extracted again, see extractLinePointsWithAttributes. Defaults to None.
+        backend (str, optional): Line extraction backend, see extractLinePointsWithAttributes. Defaults to 'auto'.
+
+    Returns:
+        tuple: A contiguous 2 x N float64 array with the points of all images one after the other (rows first,
+               columns second), an int64 array of n_images + 1 offsets, image i owns the columns offsets[i] to offsets[i + 1],
+               and the 3 x N float32 attributes of the points (see ATTRIBUTES).
+    """
+    def extract(path):
+        return extractLinePointsWithAttributes(str(path), roi, max_line_width, contrast_low, contrast_high, light_dark, backend, cache)
+
+    # Threads instead of processes, MATLAB's embedded interpreter can not spawn worker processes
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract, paths))
+    else:
+        results = [extract(path) for path in paths]
+
+    # One buffer and one offset array are converted much faster by MATLAB than a list of arrays
+    offsets = np.zeros(len(results) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([p.shape[1] for p, a in results])
+    points = np.ascontiguousarray(np.concatenate([p for p, a in results], axis=1)) if results else np.zeros((2, 0))
+    attributes = np.ascontiguousarray(np.concatenate([a for p, a in results], axis=1)) if results else np.zeros((len(ATTRIBUTES), 0), dtype=np.float32)
+    return points, offsets, attributes
+
+# MATLAB passes either a single image (path) or a list of images (paths) as global variables, and optionally the backend
+backend = str(globals().get('backend', 'auto'))
+if 'paths' in globals():
+    # The result cache is optional, MATLAB passes its folder
+    cache = None
+    if globals().get('cache_dir'):
+        from extraction_cache import ExtractionCache
+        cache = ExtractionCache(str(cache_dir))
+    points_batch, offsets_batch, attributes_batch = extractLinePointsBatch(list(paths), roi, max_line_width, contrast_low, contrast_high, light_dark, int(globals().get('workers', 1)), cache, backend)
+else:
+    points = extractLinePoints(path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend) 
\ No newline at end of file
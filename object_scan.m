@@ -5,6 +5,13 @@ pathScan = "C:\Users\Robin\OneDrive\University\Master\Masterarbeit\Experimente\2
 pathDistorted = strcat(pathScan, "left\" ,"distorted\");
 pathUndistorted = strcat(pathScan, "left\" ,"undistorted\");
 pathMasked = strcat(pathScan, "left\" ,"masked\");
+pathBackgroundDistorted = strcat(pathScan, "left\" ,"background\distorted\");
+pathBackgroundUndistorted = strcat(pathScan, "left\" ,"background\undistorted\");
+
+% Scans captured with background_subtraction in get_scan_images.py have a
+% laser-off image per pose, the extraction server then uses the differences of
+% the laser on/off pairs instead of masked images
+useBackgroundSubtraction = false;
 
 %% STEP 1: UNDISTORT PICTURES
 % Load data from camera calibration
@@ -15,18 +22,31 @@ disp('Started camera calibration.');
 
 % Reading images from the specified path
 disp('Reading images from path...');
-distortedImages = imageDatastore(pathDistorted);
+% The images are stored in the codec recorded by get_scan_images.py
+distortedImages = capture_datastore(pathDistorted, strcat(pathScan, "metadata.json"));
 distortedImageFileNames = distortedImages.Files;
 
 % Undistort images
 disp('Undistort images...')
 tUndistort = undistort_images(distortedImages, distortedCameraParams, pathUndistorted);
+if useBackgroundSubtraction
+    backgroundImages = capture_datastore(pathBackgroundDistorted, strcat(pathScan, "metadata.json"));
+    tUndistort = tUndistort + undistort_images(backgroundImages, distortedCameraParams, pathBackgroundUndistorted);
+end
 
 %% STEP 2: MASK IMAGES
-% Filter/mask laser images
-disp('Masking laser images...')
+% The persistent line extraction server (start line_extraction_server.py once
+% before the scan) masks the undistorted images in memory, otherwise the
+% masked images are written for the Python binding
+useExtractionServer = false || useBackgroundSubtraction; % the laser on/off differences are computed by the server
+maskThreshold = 112;
 undistortedImages = imageDatastore(pathUndistorted);
-tMask = mask_images(undistortedImages, pathMasked);
+if useExtractionServer
+    tMask = 0;
+else
+    disp('Masking laser images...')
+    tMask = mask_images(undistortedImages, pathMasked);
+end
 
 %% STEP 3: RECONSTRUCT OBJECT
 % Load calibration data
@@ -35,9 +55,13 @@ load(strcat(pathCalibration,"optimizedExtrinsics.mat"));
 load(strcat(pathCalibration,"planeParams.mat"));
 
 % Load images
-maskedImages = imageDatastore(pathMasked);
-maskedImageFileNames = maskedImages.Files;
-nPoses = length(maskedImageFileNames);
+if useExtractionServer
+    laserImageFileNames = undistortedImages.Files;
+else
+    maskedImages = imageDatastore(pathMasked);
+    laserImageFileNames = maskedImages.Files;
+end
+nPoses = length(laserImageFileNames);
 
 % Initialize variables
 load(strcat(pathScan,"angles.mat"))
@@ -46,20 +70,36 @@ camera3DPoints = [];
 tReconstruct = zeros(nPoses, 1);
 
 % Settings for laser line detection
-I = imread(maskedImageFileNames{1}); % Read the first image to get its size
+I = imread(laserImageFileNames{1}); % Read the first image to get its size
 resolution = size(I, 1); % [height = width]
 max_line_width = 40 * resolution / 2592; % 40 for 2592x2592
 contrast_high = 10;
 contrast_low = 0.3 * contrast_high;
 roi = [0, 0, resolution, resolution];
 
+% Find the laser lines of all poses with one request to the persistent line
+% extraction server or with one call into the Python binding. Unchanged images
+% are loaded from the result cache of the binding (the server has its own
+% --cache-dir option)
+extractionCacheDir = strcat(pathScan, "left\" ,"cache\");
+tic
+if useBackgroundSubtraction
+    backgroundImageFileNames = imageDatastore(pathBackgroundUndistorted).Files;
+    allPoints = request_line_points(laserImageFileNames, roi, max_line_width, contrast_low, contrast_high, [], [], backgroundImageFileNames);
+elseif useExtractionServer
+    allPoints = request_line_points(laserImageFileNames, roi, max_line_width, contrast_low, contrast_high, [], maskThreshold);
+else
+    allPoints = extract_line_points_batch(laserImageFileNames, roi, max_line_width, contrast_low, contrast_high, [], extractionCacheDir);
+end
+tExtract = toc;
+
 % Reconstruct object by triangulation
 textprogressbar('Reconstructing object: ');
 
 for i = 1:nPoses
     tic
-    % Find laser line
-    points = extract_line_points(maskedImageFileNames(i), roi, max_line_width, contrast_low, contrast_high);
+    % Laser line of this pose
+    points = allPoints{i};
     nPoints = length(points);
     poseCamera3DPoints = zeros(nPoints, 3);
 
@@ -98,7 +138,7 @@ pcwrite(ptCloud,strcat(pathScan, "object.ply"))
 
 % Save process times
 load(strcat(pathScan, "captureTime.mat")); % This includes tCapture only at this point
-save(strcat(pathScan, "scanTimes.mat"), "tCapture", "tUndistort", "tMask", "tReconstruct");
+save(strcat(pathScan, "scanTimes.mat"), "tCapture", "tUndistort", "tMask", "tExtract", "tReconstruct");
 
 %% Plot result
 figure
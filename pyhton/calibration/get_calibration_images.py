@@ -3,6 +3,7 @@ import time
 import cv2
 import csv
 import os
+import sys
 from create_calib_data_folder import create_calib_data_folder
 import numpy as np
 from datetime import datetime
@@ -10,10 +11,17 @@ from picamera2 import Picamera2
 from libcamera import controls
 from gpiozero import LED
 from scipy.io import savemat
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scan'))
+from image_codec import write_image, save_metadata
 
 # Define paths for storing data
 image_file_path = create_calib_data_folder('/home/robin/Dokumente/Calibration')
 
+# Codec of the saved images (png, tiff, bmp or npy, see image_codec.py) and its compression level
+image_codec = 'png'
+image_level = None
+save_metadata(image_file_path, image_codec, image_level)
+
 # Define scan procedure
 dtheta1 = 15
 dtheta2 = 45
@@ -154,14 +162,14 @@ try:
         array0 = picam0.capture_array("main")        
         image0 = cv2.rotate(array0, cv2.ROTATE_90_CLOCKWISE)
         image0 = cv2.cvtColor(image0, cv2.COLOR_RGB2BGR)
-        filename = os.path.join(image_file_path, 'right/pattern/distorted/', num + '_right_pattern.png')
-        cv2.imwrite(filename, image0) 
+        filename = os.path.join(image_file_path, 'right/pattern/distorted/', num + '_right_pattern')
+        write_image(filename, image0, image_codec, image_level)
 
         array1 = picam1.capture_array("main")
         image1 = cv2.rotate(array1, cv2.ROTATE_90_COUNTERCLOCKWISE)
         image1 = cv2.cvtColor(image1, cv2.COLOR_RGB2BGR)
-        filename = os.path.join(image_file_path, 'left/pattern/distorted/', num + '_left_pattern.png')
-        cv2.imwrite(filename, image1) 
+        filename = os.path.join(image_file_path, 'left/pattern/distorted/', num + '_left_pattern')
+        write_image(filename, image1, image_codec, image_level)
 
         # Take pictures with laser on        
         laser.on()
@@ -172,14 +180,14 @@ try:
         array0 = picam0.capture_array("main")        
         image0 = cv2.rotate(array0, cv2.ROTATE_90_CLOCKWISE)
         image0 = cv2.cvtColor(image0, cv2.COLOR_RGB2BGR)
-        filename = os.path.join(image_file_path, 'right/laser/distorted/', num + '_right_laser.png')
-        cv2.imwrite(filename, image0) 
+        filename = os.path.join(image_file_path, 'right/laser/distorted/', num + '_right_laser')
+        write_image(filename, image0, image_codec, image_level)
 
         array1 = picam1.capture_array("main")
         image1 = cv2.rotate(array1, cv2.ROTATE_90_COUNTERCLOCKWISE)
         image1 = cv2.cvtColor(image1, cv2.COLOR_RGB2BGR)
-        filename = os.path.join(image_file_path, 'left/laser/distorted/', num + '_left_laser.png')
-        cv2.imwrite(filename, image1) 
+        filename = os.path.join(image_file_path, 'left/laser/distorted/', num + '_left_laser')
+        write_image(filename, image1, image_codec, image_level)
 
         laser.off()
 
@@ -2,13 +2,20 @@ import time
 import cv2
 import csv
 import os
+import sys
 import numpy as np
 from picamera2 import Picamera2
 from libcamera import controls
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scan'))
+from image_codec import write_image
 
 # Create a folder to store the captured images and the capture times
 image_file_path = "/home/robin/dev/IndiPrint/scanner/capture_time/"
 
+# Codec of the saved images (png, tiff, bmp or npy, see image_codec.py) and its compression level
+image_codec = 'png'
+image_level = None
+
 # Configure camera and resolutions
 capture_res = []
 for mp in np.arange(0.25, 13, 0.25):
@@ -34,7 +41,7 @@ for res in capture_res:
     file_sizes = []
     for i in range(25):
         # Create a unique filename for the picture
-        filename = f"capture_{res[0]}x{res[1]}_{i}.png"
+        filename = f"capture_{res[0]}x{res[1]}_{i}"
 
         # Create a new folder for the current resolution if it doesn't exist
         if not os.path.exists(os.path.join(image_file_path, f"{res[0]}x{res[1]}")):
@@ -47,7 +54,7 @@ for res in capture_res:
 
         array = picam.capture_array("main") # Capture image as array
         image = cv2.cvtColor(array, cv2.COLOR_RGB2BGR) # Convert to BGR format        
-        cv2.imwrite(path, image) # Save image
+        path = write_image(path, image, image_codec, image_level) # Save image
 
         # Measure capture time
         end_time = time.time()
@@ -73,5 +80,5 @@ for res in capture_res:
     path = os.path.join(image_file_path, "capture_times.csv")
     with open(path, mode="a", newline="") as file:
         writer = csv.writer(file)
-        writer.writerow([f"{res[0]}x{res[1]}", res[0]*res[1], average_capture_time, average_file_size])
+        writer.writerow([f"{res[0]}x{res[1]}", res[0]*res[1], average_capture_time, average_file_size, image_codec, image_level])
     
\ No newline at end of file
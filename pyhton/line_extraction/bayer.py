@@ -0,0 +1,192 @@
+# Red plane of raw Bayer frames
+# The laser is red, so the red sites of the colour filter array already hold the whole signal. Taking
+# every second pixel of every second row gives a quarter-resolution plane without demosaicing, and a
+# point of that plane maps back to the full resolution sensor pixel it was sampled at. The raw stream
+# holds the whole sensor while the colour images (main stream) are cropped to the ScalerCrop of libcamera
+# and scaled, so the points are finally mapped into the main stream, where the calibration applies.
+
+import json
+import os
+import numpy as np
+from typing import NamedTuple
+from line_points import LinePoints
+
+# Position (row, col) of the red site within every 2 x 2 cell of the colour filter array
+RED_SITES = {'RGGB': (0, 0), 'GRBG': (0, 1), 'GBRG': (1, 0), 'BGGR': (1, 1)}
+# File next to the red planes of a scan that holds their Bayer pattern
+BAYER_FILE = 'bayer.json'
+
+class BayerFrame(NamedTuple):
+    """
+    Geometry of the red planes of a scan, recorded by get_scan_images.py in BAYER_FILE.
+
+    Attributes:
+        pattern (str): Bayer pattern of the (rotated) raw frame the planes were taken from.
+        offset (tuple): Position (x, y) of the top left corner of the main stream in the raw frame, in raw pixels.
+        scale (float): Main stream pixels per raw pixel.
+    """
+    pattern: str
+    offset: tuple = (0.0, 0.0)
+    scale: float = 1.0
+
+def checkPattern(pattern: str):
+    if pattern not in RED_SITES:
+        raise ValueError(f"Unknown Bayer pattern '{pattern}', expected one of {list(RED_SITES)}.")
+
+def parseRawFormat(raw_format: str) -> tuple:
+    """
+    Splits a libcamera raw format, e.g. 'SRGGB10_CSI2P', into its Bayer pattern and bit depth.
+
+    Parameters:
+        raw_format (str): Raw format of the sensor (Picamera2.sensor_format or the format of the raw stream).
+
+    Returns:
+        tuple: Bayer pattern (e.g. 'RGGB') and bits per pixel.
+    """
+    pattern, bit_depth = raw_format[1:5], int(raw_format[5:].split('_')[0])
+    checkPattern(pattern)
+    return pattern, bit_depth
+
+def rotatePattern(pattern: str, rotations: int = 1) -> str:
+    # Pattern of the frame rotated by rotations * 90 degrees counter-clockwise (like np.rot90 and cv.ROTATE_90_COUNTERCLOCKWISE)
+    checkPattern(pattern)
+    cell = np.rot90(np.array(list(pattern)).reshape(2, 2), rotations)
+    return ''.join(cell.ravel())
+
+def redPlane(raw: np.ndarray, pattern: str, bit_depth: int = 8, rotations: int = 0) -> tuple:
+    """
+    Takes the red sites of a raw Bayer frame as quarter-resolution 8-bit plane.
+
+    Parameters:
+        raw (np.ndarray): Raw frame (H x W), unpacked with one uint16 (or uint8) per pixel.
+        pattern (str): Bayer pattern of the frame, one of RED_SITES.
+        bit_depth (int, optional): Bits per pixel of the raw frame, the plane is scaled to 8 bits. Defaults to 8.
+        rotations (int, optional): Number of counter-clockwise quarter turns applied to the plane, like the rotation
+            of the colour images of the scanner. Defaults to 0.
+
+    Returns:
+        tuple: H/2 x W/2 uint8 plane and the Bayer pattern of the rotated full resolution frame (see toFullResolution).
+    """
+    checkPattern(pattern)
+    row, col = RED_SITES[pattern]
+    plane = raw[row::2, col::2]
+    if bit_depth > 8:
+        plane = plane >> (bit_depth - 8)
+    # Rotating the quarter-resolution plane is cheaper than rotating the raw frame
+    plane = np.ascontiguousarray(np.rot90(plane, rotations), dtype=np.uint8)
+    return plane, rotatePattern(pattern, rotations)
+
+def mainStreamFrame(pattern: str, raw_size: tuple, active_size: tuple, scaler_crop: tuple, main_size: tuple, rotations: int = 0) -> BayerFrame:
+    """
+    Computes where the main stream of a camera lies in its raw frame.
+
+    libcamera crops the main stream to ScalerCrop and scales it to the size of the stream, while a full
+    resolution raw stream covers the whole active area of the sensor.
+
+    Parameters:
+        pattern (str): Bayer pattern of the sensor (see parseRawFormat).
+        raw_size (tuple): Size (width, height) of the raw stream.
+        active_size (tuple): Size (width, height) of the active area of the sensor (PixelArrayActiveAreas).
+        scaler_crop (tuple): ScalerCrop (x, y, width, height) of the main stream in pixels of the active area.
+        main_size (tuple): Size (width, height) of the main stream.
+        rotations (int, optional): Counter-clockwise quarter turns applied to the planes and the colour images. Defaults to 0.
+
+    Returns:
+        BayerFrame: Pattern, offset and scale in the rotated raw frame.
+    """
+    # Sensor pixels per raw pixel (binning of the sensor mode)
+    binning = active_size[0] / raw_size[0]
+    x, y, width, height = (value / binning for value in scaler_crop)
+    scale = main_size[0] / width
+    frame_width, frame_height = raw_size
+    for _ in range(rotations % 4):
+        # A counter-clockwise quarter turn moves column x of the frame to row frame_width - x
+        x, y, width, height = y, frame_width - x - width, height, width
+        frame_width, frame_height = frame_height, frame_width
+    return BayerFrame(rotatePattern(pattern, rotations), (float(x), float(y)), float(scale))
+
+def rawCoordinates(points: np.ndarray, frame: BayerFrame) -> np.ndarray:
+    # Pixel coordinates [x, y] of the main stream in the raw frame (pixel centers at integer coordinates)
+    return (np.asarray(points, dtype=np.float64) + 0.5) / frame.scale - 0.5 + np.array(frame.offset)
+
+def planeRoi(roi: list, frame: BayerFrame) -> list:
+    # Region of interest [row1, col1, row2, col2] of the main stream in plane pixels
+    (col1, row1), (col2, row2) = rawCoordinates([[roi[1], roi[0]], [roi[3], roi[2]]], frame)
+    return [max(int(np.floor(row1)), 0) // 2, max(int(np.floor(col1)), 0) // 2, max(int(np.ceil(row2)), 0) // 2, max(int(np.ceil(col2)), 0) // 2]
+
+def planeWindows(windows: np.ndarray, frame: BayerFrame, n_rows: int) -> np.ndarray:
+    """
+    Reduces the search windows of the main stream (laser_windows.py) to the rows and columns of the red sites.
+
+    Parameters:
+        windows (np.ndarray): rows x 2 array [col_min, col_max] of the main stream, None for no windows.
+        frame (BayerFrame): Geometry of the planes.
+        n_rows (int): Number of rows of the plane.
+
+    Returns:
+        np.ndarray: n_rows x 2 int32 array [col_min, col_max] of plane columns, rows outside the main stream are empty.
+    """
+    if windows is None:
+        return None
+    row, col = RED_SITES[frame.pattern]
+    # Main stream row of every plane row
+    raw_rows = 2 * np.arange(n_rows) + row
+    rows = np.round((raw_rows + 0.5 - frame.offset[1]) * frame.scale - 0.5).astype(np.intp)
+    inside = (rows >= 0) & (rows < len(windows))
+    selected = windows[np.clip(rows, 0, len(windows) - 1)]
+    empty = ~inside | (selected[:, 0] > selected[:, 1])
+    first = np.floor(rawCoordinates(np.stack((selected[:, 0], raw_rows), axis=1), frame)[:, 0]).astype(np.intp)
+    last = np.ceil(rawCoordinates(np.stack((selected[:, 1], raw_rows), axis=1), frame)[:, 0]).astype(np.intp)
+    planes = np.stack(((first - col + 1) // 2, (last - col) // 2), axis=1).astype(np.int32)
+    planes[empty] = (0, -1)
+    return planes
+
+def toFullResolution(lines: LinePoints, pattern: str) -> LinePoints:
+    """
+    Maps line points of a red plane back into the pixel coordinates of the full resolution frame.
+
+    Plane pixel (x, y) is the red site (2 x + col, 2 y + row) of the frame. The normals and angles are not
+    changed by the uniform scaling, the widths are scaled with it.
+
+    Parameters:
+        lines (LinePoints): Line points in plane coordinates.
+        pattern (str): Bayer pattern of the (rotated) frame the plane was taken from.
+
+    Returns:
+        LinePoints: Line points in full resolution coordinates ([x, y] = [col, row]).
+    """
+    checkPattern(pattern)
+    row, col = RED_SITES[pattern]
+    points = lines.points * 2 + np.array([col, row], dtype=lines.points.dtype)
+    return lines._replace(points=points, width=lines.width * 2)
+
+def toMainStream(lines: LinePoints, frame: BayerFrame) -> LinePoints:
+    """
+    Maps line points of a red plane into the pixel coordinates of the main stream (the colour images of the scanner).
+
+    The points are still distorted like the captured colour images, they have to be undistorted with the camera
+    parameters of the calibration (undistortPoints) before they are triangulated with its intrinsics.
+
+    Parameters:
+        lines (LinePoints): Line points in plane coordinates.
+        frame (BayerFrame): Geometry of the planes.
+
+    Returns:
+        LinePoints: Line points in main stream coordinates ([x, y] = [col, row]).
+    """
+    lines = toFullResolution(lines, frame.pattern)
+    points = (lines.points + 0.5 - np.array(frame.offset)) * frame.scale - 0.5
+    return lines._replace(points=points.astype(lines.points.dtype), width=lines.width * frame.scale)
+
+def saveBayerFrame(folder: str, frame: BayerFrame, **capture):
+    # Records the geometry of the red planes of a scan (and the capture settings it was derived from) next to them
+    checkPattern(frame.pattern)
+    with open(os.path.join(folder, BAYER_FILE), mode='w') as file:
+        json.dump({**frame._asdict(), **capture}, file, indent=4)
+
+def loadBayerFrame(folder: str) -> BayerFrame:
+    # Files without offset and scale map the points into the raw frame only
+    with open(os.path.join(folder, BAYER_FILE)) as file:
+        recorded = json.load(file)
+    checkPattern(recorded['pattern'])
+    return BayerFrame(recorded['pattern'], tuple(recorded.get('offset', (0.0, 0.0))), float(recorded.get('scale', 1.0)))
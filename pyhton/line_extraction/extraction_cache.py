@@ -0,0 +1,128 @@
+# Content-addressed on-disk cache of line extraction results
+# The key is the hash of the image file and of the extraction parameters, so a result is reused
+# as long as neither the image nor the parameters change, wherever the image is stored.
+
+import os
+import json
+import threading
+import hashlib
+import numpy as np
+
+# Bump when the stored results change for the same image and parameters
+CACHE_VERSION = 1
+# Default size limit of the cache in bytes
+DEFAULT_MAX_BYTES = 2 * 1024**3
+# Bytes read at once while hashing an image file
+HASH_CHUNK = 1024**2
+
+def parameterValue(value):
+    # JSON representation of a parameter, arrays (e.g. search windows) are represented by their hash
+    if isinstance(value, np.ndarray):
+        return {'shape': value.shape, 'dtype': str(value.dtype), 'sha256': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [parameterValue(v) for v in value]
+    return value
+
+class ExtractionCache:
+    """
+    Stores the arrays of an extraction result per image and parameter set as .npz file.
+
+    Entries are written atomically, so several processes can share the directory. A hit refreshes the
+    modification time of the entry and the least recently used entries are evicted once the directory
+    exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._size = None
+
+    def key(self, path: str, parameters: dict, extra_paths: tuple = ()) -> str:
+        """
+        Returns the key of an image file and a set of extraction parameters.
+
+        Parameters:
+            path (str): Path to the image file, its content is hashed, not its name.
+            parameters (dict): Extraction parameters, e.g. roi, line width, contrast and backend.
+            extra_paths (tuple, optional): Further files the result depends on, e.g. the laser-off image of a pose. Defaults to ().
+
+        Returns:
+            str: Hexadecimal SHA-256 key.
+        """
+        digest = hashlib.sha256()
+        for file_path in (path, *extra_paths):
+            with open(file_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(HASH_CHUNK), b''):
+                    digest.update(chunk)
+        description = {'version': CACHE_VERSION, 'parameters': {name: parameterValue(value) for name, value in parameters.items()}}
+        digest.update(json.dumps(description, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def entryPath(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, key: str) -> dict:
+        # arrays of the entry or None if the key is not cached
+        entry = self.entryPath(key)
+        try:
+            with np.load(entry) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass  # evicted by another process in the meantime
+        return arrays
+
+    def store(self, key: str, arrays: dict):
+        entry = self.entryPath(key)
+        temporary = f'{entry}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, entry)
+
+        # Only list the directory when the running estimate exceeds the limit
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(entry)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self) -> list:
+        # (modification time, size, path) of all entries
+        result = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return result
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        # remove the least recently used entries until the cache fits into max_bytes
+        entries = sorted(self.entries())
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, entry in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        for _, _, entry in self.entries():
+            os.remove(entry)
+        self._size = 0
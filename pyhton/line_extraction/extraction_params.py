@@ -0,0 +1,85 @@
+# Parameter planning of the line extraction
+# Turns the line width and contrast (or the image resolution) into the parameters of lines_gauss once,
+# as a frozen and hashable configuration shared by all backends, caches and kernel banks.
+
+import math
+from functools import lru_cache
+from typing import NamedTuple
+
+# Line width in pixels and contrast used for the 2592 x 2592 images of the scanner (object_scan.m)
+REFERENCE_RESOLUTION = 2592
+REFERENCE_LINE_WIDTH = 40
+REFERENCE_CONTRAST_HIGH = 10
+# Ratio of the lower to the upper contrast threshold
+CONTRAST_RATIO = 0.3
+# Length limits in pixels of the extracted contours (select_contours_xld of the HALCON backend, selectContours of the Steger backend)
+MIN_CONTOUR_LENGTH = 15
+MAX_CONTOUR_LENGTH = 5000
+
+class ExtractionParams(NamedTuple):
+    """
+    Frozen configuration of a line extraction. Being a tuple of plain numbers, it can be hashed
+    and used as key of caches.
+
+    Attributes:
+        max_line_width (float): Maximum expected line width in pixels.
+        contrast_low (float): Lower threshold for line contrast in grey values.
+        contrast_high (float): Upper threshold for line contrast in grey values.
+        light_dark (str): 'light' or 'dark' lines.
+        sigma (float): Standard deviation of the gaussian derivatives.
+        help (float): Second derivative at the center of a bar of the maximum width and unit contrast.
+        low (float): Lower threshold on the second derivative (contrast_low * |help|).
+        high (float): Upper threshold on the second derivative (contrast_high * |help|).
+    """
+    max_line_width: float
+    contrast_low: float
+    contrast_high: float
+    light_dark: str
+    sigma: float
+    help: float
+    low: float
+    high: float
+
+@lru_cache(maxsize=None)
+def _plan(max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str) -> ExtractionParams:
+    half_width = max_line_width / 2.0
+    sigma = half_width / math.sqrt(3.0)
+    help = -2.0 * half_width / (math.sqrt(2.0 * math.pi) * sigma**3) * math.exp(-0.5 * (half_width / sigma)**2)
+    return ExtractionParams(max_line_width, contrast_low, contrast_high, light_dark, sigma, help,
+                            abs(contrast_low * help), abs(contrast_high * help))
+
+def planExtraction(max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light') -> ExtractionParams:
+    """
+    Converts the maximum line width and the contrast thresholds into the parameters of lines_gauss.
+    Every configuration is computed once per process.
+
+    Parameters:
+        max_line_width (float): Maximum expected line width in pixels.
+        contrast_low (float): Lower threshold for line contrast.
+        contrast_high (float): Upper threshold for line contrast.
+        light_dark (str, optional): Specifies if lines are lighter ('light') or darker ('dark') than the background. Defaults to 'light'.
+
+    Returns:
+        ExtractionParams: The configuration.
+    """
+    # Normalise the numbers, e.g. the doubles passed by MATLAB and Python ints give the same configuration
+    return _plan(float(max_line_width), float(contrast_low), float(contrast_high), str(light_dark))
+
+def planForResolution(resolution: int, line_width: float = REFERENCE_LINE_WIDTH, contrast_high: float = REFERENCE_CONTRAST_HIGH,
+                      contrast_ratio: float = CONTRAST_RATIO, light_dark: str = 'light', reference_resolution: int = REFERENCE_RESOLUTION) -> ExtractionParams:
+    """
+    Plans the extraction of images of the given resolution like object_scan.m, the line width is
+    given at the reference resolution and scaled with the image size.
+
+    Parameters:
+        resolution (int): Height (= width) of the images in pixels.
+        line_width (float, optional): Maximum line width at the reference resolution. Defaults to REFERENCE_LINE_WIDTH.
+        contrast_high (float, optional): Upper threshold for line contrast. Defaults to REFERENCE_CONTRAST_HIGH.
+        contrast_ratio (float, optional): Lower threshold as fraction of the upper one. Defaults to CONTRAST_RATIO.
+        light_dark (str, optional): See planExtraction. Defaults to 'light'.
+        reference_resolution (int, optional): Resolution the line width refers to. Defaults to REFERENCE_RESOLUTION.
+
+    Returns:
+        ExtractionParams: The configuration.
+    """
+    return planExtraction(line_width * resolution / reference_resolution, contrast_ratio * contrast_high, contrast_high, light_dark)
@@ -0,0 +1,88 @@
+# Reader layer for the laser images
+# Decodes only what the extraction needs: one plane (grey or a single colour channel)
+# and optionally at a reduced resolution, so the full BGR array is not materialised
+# where the stored format allows it.
+
+import os
+import numpy as np
+import cv2 as cv
+
+# Extensions of images stored as raw arrays (np.save), read through a memory map
+ARRAY_EXTENSIONS = ('.npy',)
+
+# imread flags of the reduced-resolution decoders (JPEG scales in the DCT domain, the other formats after decoding)
+REDUCED_GRAYSCALE = {1: cv.IMREAD_GRAYSCALE, 2: cv.IMREAD_REDUCED_GRAYSCALE_2, 4: cv.IMREAD_REDUCED_GRAYSCALE_4, 8: cv.IMREAD_REDUCED_GRAYSCALE_8}
+REDUCED_COLOR = {1: cv.IMREAD_COLOR, 2: cv.IMREAD_REDUCED_COLOR_2, 4: cv.IMREAD_REDUCED_COLOR_4, 8: cv.IMREAD_REDUCED_COLOR_8}
+
+def isArrayFile(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in ARRAY_EXTENSIONS
+
+def checkReduce(reduce: int):
+    if reduce not in REDUCED_GRAYSCALE:
+        raise ValueError(f"Unsupported reduction {reduce}, expected one of {list(REDUCED_GRAYSCALE)}.")
+
+def decode(path: str, flags: int) -> np.ndarray:
+    img = cv.imread(path, flags)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image '{path}'.")
+    return img
+
+def loadArray(path: str) -> np.ndarray:
+    # memory map, only the pages of the accessed pixels are read from disk
+    try:
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError) as error:
+        raise FileNotFoundError(f"Could not read image '{path}'.") from error
+
+def reduceArray(img: np.ndarray, reduce: int) -> np.ndarray:
+    # area average like the reduced decoders of imread
+    if reduce == 1:
+        return np.ascontiguousarray(img)
+    size = (img.shape[1] // reduce, img.shape[0] // reduce)
+    return cv.resize(np.ascontiguousarray(img), size, interpolation=cv.INTER_AREA)
+
+def readPlane(path: str, channel: int = None, reduce: int = 1) -> np.ndarray:
+    """
+    Reads a single plane of an image.
+
+    Grey PNGs (e.g. the masked images) and JPEGs are decoded straight into one plane. For colour PNGs the
+    grey conversion happens row by row inside the decoder, a single colour channel however needs the full
+    decode. Arrays (.npy, H x W or H x W x C in BGR order) are memory-mapped and only the plane is copied.
+
+    Parameters:
+        path (str): Path to the image file.
+        channel (int, optional): BGR channel to read, None for the grey image. Defaults to None.
+        reduce (int, optional): Reduction of the resolution, 1, 2, 4 or 8. Defaults to 1.
+
+    Returns:
+        np.ndarray: The plane as contiguous 2D array.
+    """
+    checkReduce(reduce)
+    if isArrayFile(path):
+        img = loadArray(path)
+        if img.ndim == 3:
+            img = cv.cvtColor(img, cv.COLOR_BGR2GRAY) if channel is None else img[:, :, channel]
+        return reduceArray(img, reduce)
+    if channel is None:
+        return decode(path, REDUCED_GRAYSCALE[reduce])
+    return cv.extractChannel(decode(path, REDUCED_COLOR[reduce]), channel)
+
+def readColor(path: str, reduce: int = 1) -> np.ndarray:
+    """
+    Reads a colour (BGR) image. Arrays are returned as read-only memory map at full resolution,
+    so callers that only need some planes of it do not copy the whole image.
+
+    Parameters:
+        path (str): Path to the image file.
+        reduce (int, optional): Reduction of the resolution, 1, 2, 4 or 8. Defaults to 1.
+
+    Returns:
+        np.ndarray: H x W x 3 BGR image.
+    """
+    checkReduce(reduce)
+    if isArrayFile(path):
+        img = loadArray(path)
+        if img.ndim == 2:
+            img = cv.cvtColor(np.ascontiguousarray(img), cv.COLOR_GRAY2BGR)
+        return img if reduce == 1 else reduceArray(img, reduce)
+    return decode(path, REDUCED_COLOR[reduce])
@@ -0,0 +1,88 @@
+# Search windows of the laser line derived from the calibration
+# The laser line lies in the calibrated laser plane, so on every image row it can only
+# appear where the viewing rays hit the plane inside the working volume of the scanner.
+
+import numpy as np
+import argparse
+from scipy.io import loadmat
+
+# Number of image rows evaluated at once
+ROWS_PER_CHUNK = 256
+
+def computeLaserWindows(plane_params, K, shape: tuple, volume: list, margin: float = 0.0, T_VC=None) -> np.ndarray:
+    """
+    Computes the admissible column range of the laser line for every image row.
+
+    Parameters:
+        plane_params (array_like): Laser plane [a, b, c] with a*x + b*y + c = z in camera coordinates (see fit_plane.m).
+        K (array_like): 3x3 camera intrinsic matrix (MATLAB convention, [fx s cx; 0 fy cy; 0 0 1]).
+        shape (tuple): Image size (rows, cols).
+        volume (list): Working volume [x_min, x_max, y_min, y_max, z_min, z_max] in camera coordinates
+                       (or in the frame given by T_VC).
+        margin (float, optional): Pixels added on both sides of every window for the width of the line. Defaults to 0.
+        T_VC (array_like, optional): 4x4 transformation from camera coordinates into the frame of the volume. Defaults to None.
+
+    Returns:
+        np.ndarray: rows x 2 int32 array [col_min, col_max] (inclusive); rows without admissible columns have col_min > col_max.
+    """
+    a, b, c = np.asarray(plane_params, dtype=np.float64).reshape(3)
+    K_inv = np.linalg.inv(np.asarray(K, dtype=np.float64))
+    n_rows, n_cols = shape[:2]
+    # K follows the MATLAB convention, so the center of the top left pixel is (1, 1)
+    u = np.arange(1, n_cols + 1, dtype=np.float64)
+    windows = np.empty((n_rows, 2), dtype=np.int32)
+    windows[:, 0] = 0
+    windows[:, 1] = -1
+
+    for start in range(0, n_rows, ROWS_PER_CHUNK):
+        v = np.arange(start + 1, min(start + ROWS_PER_CHUNK, n_rows) + 1, dtype=np.float64)[:, None]
+        # Viewing ray r = K^-1 [u, v, 1] of every pixel
+        rx = K_inv[0, 0] * u + K_inv[0, 1] * v + K_inv[0, 2]
+        ry = K_inv[1, 0] * u + K_inv[1, 1] * v + K_inv[1, 2]
+        rz = K_inv[2, 0] * u + K_inv[2, 1] * v + K_inv[2, 2]
+        # Intersection with the plane: z = a*x + b*y + c with (x, y, z) = s * r
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = c / (rz - a * rx - b * ry)
+        x, y, z = s * rx, s * ry, s * rz
+        if T_VC is not None:
+            T = np.asarray(T_VC, dtype=np.float64)
+            x, y, z = (T[i, 0] * x + T[i, 1] * y + T[i, 2] * z + T[i, 3] for i in range(3))
+        inside = (s > 0) & (x >= volume[0]) & (x <= volume[1]) & (y >= volume[2]) & (y <= volume[3]) & (z >= volume[4]) & (z <= volume[5])
+
+        # First and last admissible column of every row
+        found = inside.any(axis=1)
+        first = np.argmax(inside, axis=1)
+        last = n_cols - 1 - np.argmax(inside[:, ::-1], axis=1)
+        rows = start + np.flatnonzero(found)
+        windows[rows, 0] = np.maximum(np.floor(first[found] - margin), 0)
+        windows[rows, 1] = np.minimum(np.ceil(last[found] + margin), n_cols - 1)
+    return windows
+
+def windowMask(windows: np.ndarray, shape: tuple) -> np.ndarray:
+    # Mask of the image size that is set within the window of every row
+    cols = np.arange(shape[1])
+    return ((cols >= windows[:, 0:1]) & (cols <= windows[:, 1:2])).astype(np.uint8)
+
+def saveLaserWindows(path: str, windows: np.ndarray):
+    np.save(path, windows.astype(np.int32))
+
+def loadLaserWindows(path: str) -> np.ndarray:
+    return np.load(path)
+
+
+# Precompute the search windows once per calibration
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Computes the search windows of the laser line from planeParams.mat (planeParams and K).')
+    parser.add_argument('plane_params', help='planeParams.mat saved by scanner_calibration.m')
+    parser.add_argument('destination', help='.npy file for the windows')
+    parser.add_argument('--shape', default=[2592, 2592], type=int, nargs=2, metavar=('ROWS', 'COLS'), help='image size')
+    parser.add_argument('--volume', required=True, type=float, nargs=6, metavar=('X_MIN', 'X_MAX', 'Y_MIN', 'Y_MAX', 'Z_MIN', 'Z_MAX'), help='working volume in camera coordinates [mm]')
+    parser.add_argument('--margin', default=25.0, type=float, help='pixels added on both sides of every window')
+    args = parser.parse_args()
+
+    calibration = loadmat(args.plane_params)
+    windows = computeLaserWindows(calibration['planeParams'], calibration['K'], args.shape, args.volume, args.margin)
+    saveLaserWindows(args.destination, windows)
+
+    width = np.maximum(windows[:, 1] - windows[:, 0] + 1, 0)
+    print(f'Search windows cover {100 * width.sum() / (args.shape[0] * args.shape[1]):.1f} % of the image.')
@@ -1,12 +1,492 @@
-import halcon as ha  # Import the HALCON library for advanced image processing
 import math  # Import the math library for mathematical operations
 import cv2 as cv  # Import OpenCV for image handling and visualization
+import numpy as np # Import NumPy for array operations
 import os # Import the os library for file and directory operations
 import glob # Import the glob library for file and directory operations
-import csv # Import the csv library for reading and writing CSV files
+import importlib.util # Import importlib to check which backends can be imported
+import time # Import the time library to measure the throughput
+from concurrent.futures import ProcessPoolExecutor # Import a process pool for the batch extraction
+import threading # Import threading for the stages of the streaming pipeline
+import queue # Import queue for the bounded queues between the pipeline stages
+import argparse # Import argparse for the command line interface
+from line_points import LinePoints, makeLinePoints, emptyLinePoints, selectLinePoints, concatLinePoints # Import the common result type of all backends
+from laser_windows import windowMask, loadLaserWindows # Import the search windows derived from the laser plane
+from image_io import readPlane, readColor # Import the single-plane and reduced-resolution decoders
+from extraction_cache import ExtractionCache, DEFAULT_MAX_BYTES # Import the on-disk cache of extraction results
+from extraction_params import ExtractionParams, planExtraction, MIN_CONTOUR_LENGTH, MAX_CONTOUR_LENGTH # Import the frozen configuration of an extraction
+from bayer import BAYER_FILE, BayerFrame, planeRoi, planeWindows, toMainStream, loadBayerFrame # Import the red planes of raw Bayer frames
+
+class LineExtractionBackend:
+    """
+    Interface of all line extraction backends.
+
+    A backend is created once and then extracts the line points of any number of
+    grayscale images. Backends are registered under their name in BACKENDS. All backends
+    get the same configuration, planned once by planExtraction (extraction_params.py).
+    """
+    name = None
+    # Modules that have to be importable for the backend to work
+    requires = ()
+
+    @classmethod
+    def isAvailable(cls) -> bool:
+        return all(importlib.util.find_spec(module) is not None for module in cls.requires)
+
+    def extract(self, img: np.ndarray, params: ExtractionParams) -> LinePoints:
+        """
+        Extracts the line points of a grayscale image.
+
+        Parameters:
+            img (np.ndarray): Grayscale image.
+            params (ExtractionParams): Line width, contrast and the derived parameters of lines_gauss.
+
+        Returns:
+            LinePoints: Line points in image coordinates ([x, y] = [col, row]).
+        """
+        raise NotImplementedError
+
+# Registered backends by name and the order in which they are picked automatically
+BACKENDS = {}
+BACKEND_PREFERENCE = ['halcon', 'steger', 'scanline']
+
+def registerBackend(cls):
+    BACKENDS[cls.name] = cls
+    return cls
+
+@registerBackend
+class HalconBackend(LineExtractionBackend):
+    """HALCON lines_gauss followed by a selection of the contours by their length."""
+    name = 'halcon'
+    requires = ('halcon',)
+
+    def __init__(self):
+        import halcon as ha  # Import the HALCON library for advanced image processing
+        self.ha = ha
+
+    def extract(self, img, params):
+        ha = self.ha
+
+        # Parameters for line extraction
+        extract_width = "true"
+        line_model = 'bar-shaped'
+        complete_junctions = 'false'
+
+        # Extract lines based on specified parameters
+        lines = ha.lines_gauss(ha.himage_from_numpy_array(img), params.sigma, params.low, params.high, params.light_dark, extract_width, line_model, complete_junctions)
+
+        # Select lines based on their length
+        longLines = ha.select_contours_xld(lines, 'contour_length', MIN_CONTOUR_LENGTH, MAX_CONTOUR_LENGTH, 0, 0)
+
+        # Collect the point coordinates and attributes of the extracted lines, one array per contour
+        rows, cols, angle, response, width, contrast = [], [], [], [], [], []
+        for i in range(len(longLines)):
+            row, col = ha.get_contour_xld(longLines[i])
+            rows.append(np.asarray(row, dtype=np.float64))
+            cols.append(np.asarray(col, dtype=np.float64))
+            angle.append(np.asarray(ha.get_contour_attrib_xld(longLines[i], 'angle'), dtype=np.float64))
+            response.append(np.asarray(ha.get_contour_attrib_xld(longLines[i], 'response'), dtype=np.float64))
+            width.append(np.asarray(ha.get_contour_attrib_xld(longLines[i], 'width_left'), dtype=np.float64)
+                         + np.asarray(ha.get_contour_attrib_xld(longLines[i], 'width_right'), dtype=np.float64))
+            contrast.append(np.asarray(ha.get_contour_attrib_xld(longLines[i], 'contrast'), dtype=np.float64))
+        if not rows:
+            return emptyLinePoints()
+        rows, cols, angle, response, width, contrast = (np.concatenate(v) for v in (rows, cols, angle, response, width, contrast))
+
+        # The angle of the normal is measured against the column axis with the row axis pointing down
+        normals = np.stack((np.cos(angle), -np.sin(angle)), axis=1)
+        return makeLinePoints(np.stack((cols, rows), axis=1), normals, response, width, contrast, angle)
+
+@registerBackend
+class StegerBackend(LineExtractionBackend):
+    """NumPy implementation of the Steger algorithm (steger_line_detection.py) followed by contour linking and selection."""
+    name = 'steger'
+    requires = ('numpy', 'cv2', 'scipy')
+
+    def __init__(self):
+        import steger_line_detection
+        self.detectLines = steger_line_detection.detectLinesTiled
+        self.selectContours = steger_line_detection.selectContours
+
+    def extract(self, img, params):
+        # Large images are split into tiles on all OpenCV threads (one thread in the batch workers)
+        lines = self.detectLines(img, params.sigma, params.low, params.light_dark)
+        # Hysteresis and length selection like lines_gauss and select_contours_xld of the HALCON backend
+        lines, labels = self.selectContours(lines, MIN_CONTOUR_LENGTH, MAX_CONTOUR_LENGTH, params.high)
+        return lines
+
+@registerBackend
+class ScanlineBackend(LineExtractionBackend):
+    """Peak detection on every image row for a single, mostly vertical laser stripe (scanline_detection.py)."""
+    name = 'scanline'
+    requires = ('numpy', 'cv2')
+
+    def __init__(self):
+        import scanline_detection
+        self.detectScanlinePeaks = scanline_detection.detectScanlinePeaks
+
+    def extract(self, img, params):
+        if params.light_dark != 'light':
+            raise ValueError("The scanline backend only detects light lines.")
+        # The contrast of a masked laser image is the peak intensity of the stripe
+        return self.detectScanlinePeaks(img, params.contrast_low, half_window=int(math.ceil(params.max_line_width / 2.0)))
+
+# Backends that were already created in this process, by name
+_backendInstances = {}
+
+def availableBackends() -> list:
+    # Names of all registered backends that can be imported on this machine
+    return [name for name, cls in BACKENDS.items() if cls.isAvailable()]
+
+def getBackend(backend='auto') -> LineExtractionBackend:
+    """
+    Returns the line extraction backend with the given name, created once per process.
+
+    Parameters:
+        backend (str or LineExtractionBackend, optional): Name of a registered backend, 'auto' to pick the first
+            importable backend of BACKEND_PREFERENCE or an already created backend. Defaults to 'auto'.
+
+    Returns:
+        LineExtractionBackend: The backend.
+    """
+    if isinstance(backend, LineExtractionBackend):
+        return backend
+    if backend == 'auto':
+        available = availableBackends()
+        candidates = [name for name in BACKEND_PREFERENCE if name in available]
+        if not candidates:
+            raise RuntimeError('No line extraction backend can be imported.')
+        backend = candidates[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown line extraction backend '{backend}', expected one of {list(BACKENDS)}.")
+    if backend not in _backendInstances:
+        if not BACKENDS[backend].isAvailable():
+            raise ImportError(f"Line extraction backend '{backend}' requires {BACKENDS[backend].requires}.")
+        _backendInstances[backend] = BACKENDS[backend]()
+    return _backendInstances[backend]
+
+# Function to read an image as grayscale
+def readImage(path: str, reduce: int = 1) -> np.ndarray:
+    # Decodes straight into one grey plane, optionally at 1/2, 1/4 or 1/8 resolution (see image_io.py)
+    return readPlane(path, None, reduce)
+
+# Threshold and channel of the laser mask of mask_images.m (channel 3 of the RGB image is channel 0 in the BGR order of OpenCV)
+MASK_THRESHOLD = 112
+MASK_CHANNEL = 0
+
+# Function to mask a colour image and convert it to grayscale in memory
+def maskLaserImage(img: np.ndarray, threshold: float = MASK_THRESHOLD) -> np.ndarray:
+    """
+    Masks the laser line of a colour image like mask_images.m without the round trip through a masked PNG.
+
+    Parameters:
+        img (np.ndarray): Undistorted (or raw) BGR image.
+        threshold (float, optional): Minimum value of the laser channel, darker pixels are set to zero. Defaults to MASK_THRESHOLD.
+
+    Returns:
+        np.ndarray: Grayscale image, zero outside the mask.
+    """
+    # Masking all channels before the conversion gives zero, so the mask can be applied to the grey image directly
+    gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+    gray[img[:, :, MASK_CHANNEL] < threshold] = 0
+    return gray
+
+# Minimum increase of the grey value for a pixel to count as lit by the laser in a laser on/off pair
+DIFFERENCE_THRESHOLD = 10
+
+# Function to compute the difference of the laser-on and the laser-off image of a pose
+def readDifference(path: str, background: str) -> np.ndarray:
+    # Saturating subtraction: the ambient light cancels out and pixels that got darker become zero
+    return cv.subtract(readImage(path), readImage(background))
+
+# Function to create the mask of the pixels lit by the laser in a difference image
+def changedMask(img: np.ndarray, threshold: float = DIFFERENCE_THRESHOLD) -> np.ndarray:
+    mask = (img >= threshold).astype(np.uint8)
+    # Isolated pixels (sensor noise, flicker of the ambient light) are removed, the laser line is wider
+    return cv.morphologyEx(mask, cv.MORPH_OPEN, cv.getStructuringElement(cv.MORPH_RECT, (3, 3)))
+
+# Function to read the grayscale image of a pose, masked in memory if a threshold is given
+def readFrame(path: str, mask_threshold: float = None, debug_dir: str = None, background: str = None) -> np.ndarray:
+    if background is not None:
+        # The difference to the laser-off image replaces the mask
+        gray = readDifference(path, background)
+    elif mask_threshold is not None:
+        # Arrays are memory-mapped, so only the laser channel and the grey image are materialised
+        gray = maskLaserImage(readColor(path), mask_threshold)
+    else:
+        return readImage(path)
+    # The masked image is only written for debugging, named like the output of mask_images.m
+    if debug_dir is not None:
+        cv.imwrite(os.path.join(debug_dir, poseName(path) + '_masked.png'), gray)
+    return gray
+
+# Function to extract the line points within a region of interest of an already loaded image
+def extractLines(img: np.ndarray, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto') -> LinePoints:
+    """
+    Extracts line points within a specified region of interest from a grayscale image.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        roi (list): A list specifying the region of interest in the format [row1, col1, row2, col2].
+        max_line_width (float): Maximum expected line width in pixels.
+        contrast_low (float): Lower threshold for line contrast.
+        contrast_high (float): Upper threshold for line contrast.
+        light_dark (str, optional): Specifies if lines are lighter ('light') or darker ('dark') than the background. Defaults to 'light'.
+        backend (str or LineExtractionBackend, optional): Backend used for the extraction, see getBackend. Defaults to 'auto'.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    # Crop to the specified region of interest (corners included like crop_rectangle1)
+    row1, col1, row2, col2 = (int(v) for v in roi)
+    img_roi = np.ascontiguousarray(img[row1:row2 + 1, col1:col2 + 1])
+
+    lines = getBackend(backend).extract(img_roi, planExtraction(max_line_width, contrast_low, contrast_high, light_dark))
+
+    # Adjust points' coordinates based on the ROI's offset
+    lines.points[...] += np.array([col1, row1], dtype=lines.points.dtype)
+    return lines
+
+# Function to extract the line points only within the search windows of the laser plane
+def extractInWindows(img: np.ndarray, windows: np.ndarray, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto') -> LinePoints:
+    """
+    Extracts line points only within the per-row search windows computed from the calibration (laser_windows.py).
+    Points outside the windows (e.g. reflections outside the laser plane's footprint) are rejected.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        windows (np.ndarray): rows x 2 array [col_min, col_max] of admissible columns, None searches the whole region of interest.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    if windows is None:
+        return extractLines(img, roi, max_line_width, contrast_low, contrast_high, light_dark, backend)
+    return extractInMask(img, windowMask(windows, img.shape), roi, max_line_width, contrast_low, contrast_high, light_dark, backend, PYRAMID_STRIP_ROWS)
+
+# Default margin in pixels of the band around the points of the previous pose
+TRACKING_MARGIN = 50
+
+# Function to create a mask of all pixels within a margin around the given points
+def bandMask(shape: tuple, points: np.ndarray, margin: int) -> np.ndarray:
+    mask = np.zeros(shape[:2], dtype=np.uint8)
+    cols = np.clip(np.round(points[:, 0]).astype(np.intp), 0, shape[1] - 1)
+    rows = np.clip(np.round(points[:, 1]).astype(np.intp), 0, shape[0] - 1)
+    mask[rows, cols] = 1
+    return cv.dilate(mask, cv.getStructuringElement(cv.MORPH_RECT, (2 * margin + 1, 2 * margin + 1)))
+
+# Function to extract the line points only within a mask
+def extractInMask(img: np.ndarray, mask: np.ndarray, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', strip_rows: int = None) -> LinePoints:
+    """
+    Extracts line points only within the bounding box of a mask (intersected with the region of interest)
+    and keeps the points that lie on the mask.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        mask (np.ndarray): Mask of the image size, nonzero where lines are searched.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+        strip_rows (int, optional): If set, the mask is processed in horizontal strips of this height, each cropped to
+            its own bounding box, so that slanted or curved lines do not span the whole image. Defaults to None (one box).
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    # The filters of the backends need some context around the mask
+    pad = int(math.ceil(max_line_width))
+    strip_rows = strip_rows or mask.shape[0]
+    parts = []
+    for start in range(0, mask.shape[0], strip_rows):
+        strip = mask[start:start + strip_rows]
+        rows = np.flatnonzero(strip.any(axis=1))
+        cols = np.flatnonzero(strip.any(axis=0))
+        if rows.size == 0:
+            continue
+        box = [max(start + rows[0] - pad, int(roi[0])), max(cols[0] - pad, int(roi[1])),
+               min(start + rows[-1] + pad, int(roi[2])), min(cols[-1] + pad, int(roi[3]))]
+        if box[0] > box[2] or box[1] > box[3]:
+            continue
+        lines = extractLines(img, box, max_line_width, contrast_low, contrast_high, light_dark, backend)
+
+        # Keep the points on the mask within the strip only, the padding belongs to the neighbouring strips
+        col = np.clip(np.round(lines.points[:, 0]).astype(np.intp), 0, mask.shape[1] - 1)
+        row = np.clip(np.round(lines.points[:, 1]).astype(np.intp), 0, mask.shape[0] - 1)
+        parts.append(selectLinePoints(lines, (mask[row, col] > 0) & (row >= start) & (row < start + strip_rows)))
+    return concatLinePoints(parts)
+
+# Function to extract the line points in a band around the points of the previous pose
+def extractTracked(img: np.ndarray, previous, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', margin: int = TRACKING_MARGIN, windows: np.ndarray = None, pyramid: int = None, difference: bool = False) -> LinePoints:
+    """
+    Extracts line points in a band around the line points of the previous pose.
+
+    Consecutive poses of a scan only differ by a small rotation, so the laser line moves only a few pixels.
+    If the band yields less than half of the previous points (e.g. the line left the band), the whole
+    region of interest is searched instead.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        previous (LinePoints or np.ndarray): Line points ([x, y]) of the previous pose, None for the first pose.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+        margin (int, optional): Half width of the band around the previous points in pixels. Defaults to TRACKING_MARGIN.
+        windows (np.ndarray, optional): Search windows of the laser plane, see extractInWindows. Defaults to None.
+        pyramid (int, optional): Downsampling factor of the fallback search, see extractPyramid. Defaults to None.
+        difference (bool, optional): img is the difference of a laser on/off pair, see extractFrame. Defaults to False.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    if isinstance(previous, LinePoints):
+        previous = previous.points
+    if previous is not None and len(previous) > 0:
+        mask = bandMask(img.shape, previous, margin)
+        if windows is not None:
+            mask &= windowMask(windows, img.shape)
+        if difference:
+            mask &= changedMask(img)
+        lines = extractInMask(img, mask, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, PYRAMID_STRIP_ROWS)
+        if 2 * len(lines.points) >= len(previous):
+            return lines
+    # Fall back to the full region of interest
+    return extractFrame(img, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, difference)
+
+# Default downsampling factor of the coarse search and the smallest line width searched at the coarse level
+PYRAMID_FACTOR = 4
+PYRAMID_MIN_LINE_WIDTH = 3.0
+# Height in pixels of the strips extracted at full resolution
+PYRAMID_STRIP_ROWS = 256
+
+# Function to extract the line points coarse-to-fine
+def extractPyramid(img: np.ndarray, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', factor: int = PYRAMID_FACTOR, margin: int = None, windows: np.ndarray = None) -> LinePoints:
+    """
+    Extracts line points coarse-to-fine: the line is first located in a downsampled image, then the full
+    resolution extraction only runs in narrow strips around the coarse points.
+
+    Most of the filter cost of large images is spent on the empty background. The coarse level is averaged
+    (cv.INTER_AREA), so the contrast of lines wider than the factor is preserved and the same thresholds apply.
+    The points are computed at full resolution, so their precision is the same as that of extractLines.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+        factor (int, optional): Downsampling factor of the coarse level, e.g. 4 or 8. Defaults to PYRAMID_FACTOR.
+        margin (int, optional): Half width in pixels of the band around the coarse points. Defaults to None
+            (two coarse pixels plus half the line width).
+        windows (np.ndarray, optional): Search windows of the laser plane, see extractInWindows. Defaults to None.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    factor = int(factor)
+    if margin is None:
+        margin = 2 * factor + int(math.ceil(max_line_width / 2))
+
+    # Locate the line at the coarse level
+    row1, col1, row2, col2 = (int(v) for v in roi)
+    img_roi = img[row1:row2 + 1, col1:col2 + 1]
+    coarse = cv.resize(img_roi, (max(img_roi.shape[1] // factor, 1), max(img_roi.shape[0] // factor, 1)), interpolation=cv.INTER_AREA)
+    coarse_width = max(max_line_width / factor, PYRAMID_MIN_LINE_WIDTH)
+    found = getBackend(backend).extract(coarse, planExtraction(coarse_width, contrast_low, contrast_high, light_dark))
+    if len(found.points) == 0:
+        return emptyLinePoints()
+
+    # Coarse pixel i covers the full resolution pixels factor * i ... factor * i + factor - 1
+    points = found.points * factor + np.array([col1 + (factor - 1) / 2, row1 + (factor - 1) / 2], dtype=np.float32)
+    mask = bandMask(img.shape, points, margin)
+    if windows is not None:
+        mask &= windowMask(windows, img.shape)
+    return extractInMask(img, mask, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, PYRAMID_STRIP_ROWS)
+
+# Function to extract the line points of a whole image with the selected search strategy
+def extractFrame(img: np.ndarray, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', windows: np.ndarray = None, pyramid: int = None, difference: bool = False) -> LinePoints:
+    # The difference of a laser on/off pair is only searched at the pixels lit by the laser, in strips like the pyramid
+    if difference:
+        mask = changedMask(img)
+        if windows is not None:
+            mask &= windowMask(windows, img.shape)
+        return extractInMask(img, mask, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, PYRAMID_STRIP_ROWS)
+    # Coarse-to-fine if a pyramid factor is given, otherwise the (windowed) region of interest at full resolution
+    if pyramid:
+        return extractPyramid(img, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, pyramid, windows=windows)
+    return extractInWindows(img, windows, roi, max_line_width, contrast_low, contrast_high, light_dark, backend)
+
+# Function to extract the line points of the red plane of a raw Bayer frame
+def extractBayerFrame(plane: np.ndarray, frame: BayerFrame, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', windows: np.ndarray = None, pyramid: int = None, difference: bool = False) -> LinePoints:
+    """
+    Extracts line points from the quarter-resolution red plane of a raw frame (see bayer.redPlane) and maps them
+    into the pixel coordinates of the main stream, so no demosaicing or colour conversion is needed.
+
+    Parameters:
+        plane (np.ndarray): Red plane, every pixel is one red site of the frame.
+        frame (BayerFrame): Bayer pattern of the frame the plane was taken from and the position of the main stream in it.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, difference: See extractFrame,
+            given in main stream pixels.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the main stream, still distorted (see bayer.toMainStream).
+    """
+    lines = extractFrame(plane, planeRoi(roi, frame), max_line_width / (2 * frame.scale), contrast_low, contrast_high, light_dark, backend,
+                         planeWindows(windows, frame, plane.shape[0]), pyramid, difference)
+    return toMainStream(lines, frame)
+
+# Function to compute the cache key of an image file and the extraction parameters
+def cacheKey(cache: ExtractionCache, path: str, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', windows: np.ndarray = None, pyramid: int = None, mask_threshold: float = None, background: str = None, bayer: BayerFrame = None) -> str:
+    # The configuration and the roi are normalised, so that e.g. the doubles passed by MATLAB give the same key as Python ints
+    parameters = dict(planExtraction(max_line_width, contrast_low, contrast_high, light_dark)._asdict(),
+                      roi=[int(v) for v in roi], backend=getBackend(backend).name, windows=windows, pyramid=pyramid,
+                      mask_threshold=None if mask_threshold is None else float(mask_threshold),
+                      difference_threshold=None if background is None else DIFFERENCE_THRESHOLD, bayer=None if bayer is None else bayer._asdict())
+    # The content of the laser-off image is part of the key
+    return cache.key(path, parameters, () if background is None else (background,))
+
+# Function to look up the line points of a cache key, None if they are not cached
+def loadCachedLines(cache: ExtractionCache, key: str) -> LinePoints:
+    arrays = cache.load(key)
+    # Entries of older layouts are treated as missing
+    if arrays is None or any(field not in arrays for field in LinePoints._fields):
+        return None
+    return LinePoints(*(arrays[field] for field in LinePoints._fields))
+
+def storeCachedLines(cache: ExtractionCache, key: str, lines: LinePoints):
+    cache.store(key, lines._asdict())
+
+# Function to extract the line points of an image file, reusing the cached result if there is one
+def extractCached(path: str, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', windows: np.ndarray = None, pyramid: int = None, mask_threshold: float = None, debug_dir: str = None, cache: ExtractionCache = None, background: str = None, bayer: BayerFrame = None) -> LinePoints:
+    """
+    Reads an image file and extracts its line points with extractFrame, or loads them from the cache.
+
+    Parameters:
+        path (str): Path to the image file.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid: See extractFrame.
+        mask_threshold, debug_dir: See readFrame.
+        cache (ExtractionCache, optional): Cache of the results, None to always extract. Defaults to None.
+        background (str, optional): Laser-off image of the pose, the difference to it is extracted instead of the masked
+            image (see readDifference). Defaults to None.
+        bayer (BayerFrame, optional): If set, path is the red plane of a raw frame with this geometry, see extractBayerFrame.
+            Defaults to None.
+
+    Returns:
+        LinePoints: Line points in image coordinates ([x, y] = [col, row]) of the full image.
+    """
+    if cache is not None:
+        key = cacheKey(cache, path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, mask_threshold, background, bayer)
+        lines = loadCachedLines(cache, key)
+        if lines is not None:
+            return lines
+    if bayer is not None:
+        # The red plane holds the laser only, it is not masked
+        lines = extractBayerFrame(readFrame(path, None, debug_dir, background), bayer, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, background is not None)
+    else:
+        lines = extractFrame(readFrame(path, mask_threshold, debug_dir, background), roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, background is not None)
+    if cache is not None:
+        storeCachedLines(cache, key, lines)
+    return lines
+
+# Function to convert line points into the 2 x N float64 layout handed to MATLAB
+def rowColArray(lines: LinePoints) -> np.ndarray:
+    # Rows first, columns second as returned by get_contour_xld
+    return np.ascontiguousarray(lines.points[:, ::-1].T, dtype=np.float64)
 
 # Function to extract points along lines within a specified region of interest from an image
-def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light') -> list:
+def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: int, contrast_high: int, light_dark: str = 'light', backend='auto', cache: ExtractionCache = None) -> np.ndarray:
     """
     Extracts points along lines within a specified region of interest from an image.
 
@@ -17,62 +497,312 @@ def extractLinePoints(path: str, roi: list, max_line_width: int, contrast_low: i
         contrast_low (int): Lower threshold for line contrast.
         contrast_high (int): Upper threshold for line contrast.
         light_dark (str, optional): Specifies if lines are lighter ('light') or darker ('dark') than the background. Defaults to 'light'.
+        backend (str or LineExtractionBackend, optional): Backend used for the extraction, see getBackend. Defaults to 'auto'.
+        cache (ExtractionCache, optional): Cache of the results, see extractCached. Defaults to None.
 
     Returns:
-        list: A list containing two lists, the first for x-coordinates and the second for y-coordinates of the line points.
-    """
-    # Calculate necessary parameters for line extraction based on inputs
-    half_width = max_line_width / 2.0
-    sigma = half_width / math.sqrt(3.0)
-    help = -2.0 * half_width / (math.sqrt(6.283185307178) * math.pow(sigma,3.0)) * math.exp(-0.5 * pow(half_width / sigma,2.0))
-    high = math.fabs(contrast_high * help)
-    low = math.fabs(contrast_low * help)
-
-    # Read the image and crop to the specified region of interest
-    img = ha.read_image(path)
-    img_roi = ha.crop_rectangle1(img, roi[0], roi[1], roi[2], roi[3])
-
-    # Parameters for line extraction
-    extract_width = "true"
-    line_model = 'bar-shaped'
-    complete_junctions = 'false'
-    
-    # Extract lines within the ROI based on specified parameters
-    lines = ha.lines_gauss(img_roi, sigma, low, high, light_dark, extract_width, line_model, complete_junctions)
-
-    # Select lines based on their length
-    longLines = ha.select_contours_xld(lines, 'contour_length', 15, 5000, 0, 0)
-
-    # Initialize lists to store coordinates of extracted line points
-    x = []
-    y  = []
-
-    # Iterate over extracted lines to collect their point coordinates
-    for i in range(len(longLines)):
-        new_points = ha.get_contour_xld(longLines[i])
-        x.extend(new_points[0])
-        y.extend(new_points[1])
-
-    # Adjust points' coordinates based on the ROI's offset
-    row = [x[i] + roi[0] for i in range(len(x))]
-    col = [y[i] + roi[1] for i in range(len(y))]
-    points = [row, col]
-
-    return points
+        np.ndarray: A contiguous 2 x N float64 array, the first row holds the row (y) and the second the column (x) coordinates of the line points.
+    """
+    lines = extractCached(path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, cache=cache)
+    return rowColArray(lines)
 
 # Function to find pictures in a folder and its subfolders
 def find_pictures_in_folder(folder_path):
     # Define the picture file extensions to search for
-    picture_extensions = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.tiff', '*.webp']
+    picture_extensions = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.tif', '*.tiff', '*.webp', '*.npy']
     picture_paths = []
 
     # Search for pictures in the specified folder and its subfolders
     for extension in picture_extensions:
         picture_paths.extend(glob.glob(os.path.join(folder_path, '**', extension), recursive=True))
 
+    # Sort the paths so the pose numbers in the file names give the order
+    picture_paths.sort()
+
     # Return the total number of pictures found and their paths
     return len(picture_paths), picture_paths
 
+# Backend of the current batch worker process, created once by _initWorker
+_workerBackend = None
+
+def _initWorker(backend, opencv_threads=None):
+    global _workerBackend
+    # One OpenCV thread per worker process, the pool already uses all cores
+    if opencv_threads is not None:
+        cv.setNumThreads(opencv_threads)
+    _workerBackend = getBackend(backend)
+
+def _extractWorker(task):
+    path, roi, max_line_width, contrast_low, contrast_high, light_dark, windows, pyramid, mask_threshold, debug_dir, cache, background, bayer = task
+    return extractCached(path, roi, max_line_width, contrast_low, contrast_high, light_dark, _workerBackend, windows, pyramid, mask_threshold, debug_dir, cache, background, bayer)
+
+# Function to pair every image with its laser-off image (None without background subtraction)
+def checkBackgrounds(paths: list, backgrounds: list) -> list:
+    if backgrounds is None:
+        return [None] * len(paths)
+    if len(backgrounds) != len(paths):
+        raise ValueError(f'Got {len(backgrounds)} laser-off images for {len(paths)} laser images.')
+    return list(backgrounds)
+
+# Function to print the throughput of an extraction run
+def printThroughput(n_images: int, n_points: int, elapsed: float):
+    elapsed = max(elapsed, 1e-9)
+    print(f'Extracted {n_points} points from {n_images} images in {elapsed:.2f} s '
+          f'({n_images / elapsed:.2f} images/s, {n_points / elapsed:.0f} points/s).')
+
+# Function to extract the line points of many images in parallel
+def extractBatch(paths: list, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', workers: int = None, verbose: bool = True, windows: np.ndarray = None, pyramid: int = None, mask_threshold: float = None, debug_dir: str = None, cache: ExtractionCache = None, backgrounds: list = None, bayer: BayerFrame = None) -> list:
+    """
+    Extracts the line points of a list of images on a process pool.
+
+    Every worker process creates the backend once and then extracts its share of the images.
+
+    Parameters:
+        paths (list): Paths to the image files, in pose order.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+        workers (int, optional): Number of worker processes, 1 extracts in the current process. Defaults to the number of cores.
+        verbose (bool, optional): Prints a throughput summary. Defaults to True.
+        windows (np.ndarray, optional): Search windows of the laser plane, see extractInWindows. Defaults to None.
+        pyramid (int, optional): Downsampling factor of the coarse-to-fine search, see extractPyramid. Defaults to None.
+        mask_threshold (float, optional): If set, the paths are colour images that are masked in memory, see maskLaserImage.
+            Defaults to None (the paths are already masked grayscale images).
+        debug_dir (str, optional): Folder for the masked images, only written for debugging. Defaults to None.
+        cache (ExtractionCache, optional): Cache of the results, cached images are not read again. Defaults to None.
+        backgrounds (list, optional): Laser-off images of the poses in the order of paths. If given, the differences of the
+            laser on/off pairs are extracted instead of masked images (see readDifference). Defaults to None.
+        bayer (BayerFrame, optional): If set, the paths are red planes of raw frames with this geometry (see extractBayerFrame),
+            the points are returned in main stream coordinates. Defaults to None.
+
+    Returns:
+        list: LinePoints of every image in the order of paths.
+    """
+    # Workers only receive the name of the backend and create it themselves
+    if isinstance(backend, LineExtractionBackend):
+        backend = backend.name
+    backgrounds = checkBackgrounds(paths, backgrounds)
+    tasks = [(path, roi, max_line_width, contrast_low, contrast_high, light_dark, windows, pyramid, mask_threshold, debug_dir, cache, background, bayer) for path, background in zip(paths, backgrounds)]
+
+    start = time.time()
+    if workers == 1:
+        _initWorker(backend)
+        results = [_extractWorker(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(backend, 1)) as pool:
+            # map returns the results in the order of the tasks, i.e. in pose order
+            results = list(pool.map(_extractWorker, tasks))
+    elapsed = time.time() - start
+
+    if verbose:
+        printThroughput(len(results), sum(len(lines.points) for lines in results), elapsed)
+    return results
+
+
+# Marks the end of the stream in the queues of the streaming pipeline
+_END_OF_STREAM = object()
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # Waits while the queue is full until the item is queued or the pipeline is stopped
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event):
+    # Waits while the queue is empty until an item arrives or the pipeline is stopped
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _END_OF_STREAM
+
+def _readStage(paths, backgrounds, decoded, stop, mask_threshold, debug_dir, cache, cache_key, bayer):
+    # Reads, decodes and masks the images ahead of the extraction, cached results are passed on without decoding
+    try:
+        for path, background in zip(paths, backgrounds):
+            key = cache_key(path, background) if cache_key is not None else None
+            lines = loadCachedLines(cache, key) if key is not None else None
+            img = readFrame(path, mask_threshold if bayer is None else None, debug_dir, background) if lines is None else None
+            if not _put(decoded, (path, img, key, lines), stop):
+                return
+    except Exception as error:
+        _put(decoded, error, stop)
+        return
+    _put(decoded, _END_OF_STREAM, stop)
+
+def _extractStage(decoded, extracted, stop, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, track_margin, windows, pyramid, cache, difference, bayer):
+    # Extracts the line points of the decoded images
+    try:
+        backend = getBackend(backend)
+        previous = None
+        while True:
+            item = _get(decoded, stop)
+            # End of stream and errors of the reader are passed on to the consumer
+            if item is _END_OF_STREAM or isinstance(item, Exception):
+                _put(extracted, item, stop)
+                return
+            path, img, key, lines = item
+            if lines is not None:
+                pass  # Cached result
+            elif bayer is not None:
+                lines = extractBayerFrame(img, bayer, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, difference)
+                if key is not None:
+                    storeCachedLines(cache, key, lines)
+            elif track_margin is None:
+                lines = extractFrame(img, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, difference)
+                if key is not None:
+                    storeCachedLines(cache, key, lines)
+            else:
+                # Search around the line of the previous pose
+                lines = extractTracked(img, previous, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, track_margin, windows, pyramid, difference)
+                previous = lines
+            if not _put(extracted, (path, lines), stop):
+                return
+    except Exception as error:
+        _put(extracted, error, stop)
+
+# Generator that reads, extracts and hands out the line points of many images concurrently
+def streamLinePoints(paths: list, roi: list, max_line_width: float, contrast_low: float, contrast_high: float, light_dark: str = 'light', backend='auto', queue_size: int = 4, verbose: bool = True, track_margin: int = None, windows: np.ndarray = None, pyramid: int = None, mask_threshold: float = None, debug_dir: str = None, cache: ExtractionCache = None, backgrounds: list = None, bayer: BayerFrame = None):
+    """
+    Streams the line points of a list of images through a reader and an extraction stage.
+
+    The reader thread decodes the next images while the extraction thread processes the current one and
+    the caller (e.g. a writer) consumes the results. Both stages are joined by bounded queues, so at most
+    2 * queue_size images and results are held in memory.
+
+    Parameters:
+        paths (list): Paths to the image files, in pose order.
+        roi, max_line_width, contrast_low, contrast_high, light_dark, backend: See extractLines.
+        queue_size (int, optional): Capacity of each queue between the stages. Defaults to 4.
+        verbose (bool, optional): Prints a throughput summary at the end of the stream. Defaults to True.
+        track_margin (int, optional): If set, every image is only searched in a band of this margin around the
+            points of the previous image (see extractTracked). Defaults to None (full region of interest).
+        windows (np.ndarray, optional): Search windows of the laser plane, see extractInWindows. Defaults to None.
+        pyramid (int, optional): Downsampling factor of the coarse-to-fine search, see extractPyramid. Defaults to None.
+        mask_threshold (float, optional): If set, the paths are colour images that are masked in memory by the reader,
+            see maskLaserImage. Defaults to None.
+        debug_dir (str, optional): Folder for the masked images, only written for debugging. Defaults to None.
+        cache (ExtractionCache, optional): Cache of the results, cached images are not decoded. The result of an image
+            depends on the previous one when tracking, so the cache is not used together with track_margin. Defaults to None.
+        backgrounds (list, optional): Laser-off images of the poses in the order of paths, see extractBatch. Defaults to None.
+        bayer (BayerFrame, optional): If set, the paths are red planes of raw frames with this geometry, see extractBatch.
+            Red planes are not tracked. Defaults to None.
+
+    Yields:
+        tuple: Path of the image and its LinePoints, in the order of paths.
+    """
+    if bayer is not None and track_margin is not None:
+        raise ValueError('Tracking is not supported for the red planes of raw frames.')
+    difference = backgrounds is not None
+    backgrounds = checkBackgrounds(paths, backgrounds)
+    cache_key = None
+    if cache is not None and track_margin is None:
+        def cache_key(path, background):
+            return cacheKey(cache, path, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, windows, pyramid, mask_threshold, background, bayer)
+    decoded = queue.Queue(maxsize=queue_size)
+    extracted = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    stages = [threading.Thread(target=_readStage, args=(paths, backgrounds, decoded, stop, mask_threshold, debug_dir, cache, cache_key, bayer), daemon=True),
+              threading.Thread(target=_extractStage, args=(decoded, extracted, stop, roi, max_line_width, contrast_low, contrast_high, light_dark, backend, track_margin, windows, pyramid, cache, difference, bayer), daemon=True)]
+    for stage in stages:
+        stage.start()
+
+    start = time.time()
+    n_images = 0
+    n_points = 0
+    try:
+        while True:
+            item = extracted.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+            n_images += 1
+            n_points += len(item[1].points)
+            yield item
+    finally:
+        # Also stops the stages if the consumer leaves early
+        stop.set()
+        for stage in stages:
+            stage.join()
+
+    if verbose:
+        printThroughput(n_images, n_points, time.time() - start)
+
+# Output formats of the extracted contours
+CONTOUR_FORMATS = ['csv', 'npy', 'container']
+
+# Function to get the pose number from an image file name, e.g. '0012_left_scan_masked.png' -> '0012'
+def poseName(path: str) -> str:
+    return os.path.basename(path).split('_')[0]
+
+# Function to save the points of one pose as CSV file ([x, y] per row)
+def writeContourCsv(destination: str, points: np.ndarray):
+    np.savetxt(destination, points, fmt='%.6f', delimiter=',')
+
+# Function to save the points of one pose as .npy file (N x 2 float32, [x, y])
+def writeContourNpy(destination: str, points: np.ndarray):
+    np.save(destination, np.ascontiguousarray(points, dtype=np.float32))
+
+class ContourContainer:
+    """
+    Scan-wide binary container for the contour points of all poses.
+
+    The container consists of three files next to each other:
+        <base>.bin          raw little-endian float32 [x, y] pairs of all poses, one pose after the other
+        <base>_offsets.bin  raw little-endian int64 offsets, pose i owns the points offsets[i] to offsets[i + 1]
+        <base>_poses.txt    pose names, one per line
+
+    Both binary files can be opened with np.memmap (see loadContourContainer) or MATLAB's memmapfile.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.file = open(base_path + '.bin', 'wb')
+        self.offsets = [0]
+        self.names = []
+
+    def append(self, name: str, points: np.ndarray):
+        points = np.ascontiguousarray(points, dtype='<f4').reshape(-1, 2)
+        points.tofile(self.file)
+        self.offsets.append(self.offsets[-1] + len(points))
+        self.names.append(name)
+
+    def close(self):
+        self.file.close()
+        np.asarray(self.offsets, dtype='<i8').tofile(self.base_path + '_offsets.bin')
+        with open(self.base_path + '_poses.txt', mode='w') as file:
+            file.write('\n'.join(self.names))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Function to open a contour container without copying the points
+def loadContourContainer(base_path: str) -> tuple:
+    """
+    Opens a contour container written by ContourContainer.
+
+    Parameters:
+        base_path (str): Path of the container without extension.
+
+    Returns:
+        tuple: Memory-mapped points of all poses (N x 2 float32, [x, y]), offsets (n_poses + 1) and pose names.
+               The points of pose i are points[offsets[i]:offsets[i + 1]].
+    """
+    offsets = np.fromfile(base_path + '_offsets.bin', dtype='<i8')
+    with open(base_path + '_poses.txt') as file:
+        names = file.read().splitlines()
+    # np.memmap can not map an empty file
+    if offsets[-1] == 0:
+        return np.zeros((0, 2), dtype=np.float32), offsets, names
+    points = np.memmap(base_path + '.bin', dtype='<f4', mode='r', shape=(int(offsets[-1]), 2))
+    return points, offsets, names
 
 # Example usage of the function to extract line points from an image
 if __name__ == "__main__":
@@ -83,28 +813,65 @@ if __name__ == "__main__":
     max_line_width = 50  # Max line width in pixels
     contrast_low = 3
     contrast_high = 10  # Line contrast
+    backend = 'auto' # Line extraction backend, one of BACKENDS or 'auto'
+    workers = os.cpu_count() # Number of worker processes
+
+    # The configuration above can be overwritten from the command line
+    parser = argparse.ArgumentParser(description='Extracts the laser line points of all images in a folder.')
+    parser.add_argument('--source', default=path_source, help='folder with the (masked) images')
+    parser.add_argument('--destination', default=path_save, help='folder for the extracted contours')
+    parser.add_argument('--roi', default=roi, type=int, nargs=4, metavar=('ROW1', 'COL1', 'ROW2', 'COL2'), help='region of interest')
+    parser.add_argument('--max-line-width', default=max_line_width, type=float, help='maximum line width in pixels')
+    parser.add_argument('--contrast-low', default=contrast_low, type=float, help='lower threshold for line contrast')
+    parser.add_argument('--contrast-high', default=contrast_high, type=float, help='upper threshold for line contrast')
+    parser.add_argument('--backend', default=backend, choices=['auto'] + list(BACKENDS), help='line extraction backend')
+    parser.add_argument('--workers', default=workers, type=int, help='number of worker processes of the batch mode')
+    parser.add_argument('--stream', action='store_true', help='use the streaming pipeline instead of the batch mode')
+    parser.add_argument('--queue-size', default=4, type=int, help='capacity of the queues of the streaming pipeline')
+    parser.add_argument('--track', action='store_true', help='search only around the line of the previous pose (uses the streaming pipeline)')
+    parser.add_argument('--track-margin', default=TRACKING_MARGIN, type=int, help='margin in pixels of the band around the previous line')
+    parser.add_argument('--windows', default=None, help='.npy file with the search windows of the laser plane (laser_windows.py)')
+    parser.add_argument('--pyramid', default=None, type=int, choices=[4, 8], help='locate the line at 1/4 or 1/8 resolution first and extract only around it')
+    parser.add_argument('--mask', default=None, type=float, nargs='?', const=MASK_THRESHOLD, metavar='THRESHOLD', help='the source holds undistorted colour images that are masked in memory (threshold of mask_images.m by default)')
+    parser.add_argument('--background', default=None, metavar='FOLDER', help='folder with the laser-off images of the same poses, the differences of the laser on/off pairs are extracted instead of masked images')
+    parser.add_argument('--bayer', action='store_true', help=f'the source holds the red planes of raw frames (get_scan_images.py with raw_capture), the points are mapped into the (distorted) colour images with the geometry in {BAYER_FILE} and have to be undistorted before the triangulation')
+    parser.add_argument('--debug-masked', default=None, metavar='FOLDER', help='also write the masked images to this folder')
+    parser.add_argument('--cache-dir', default=None, help='folder of the result cache, unchanged images are not extracted again')
+    parser.add_argument('--cache-size', default=DEFAULT_MAX_BYTES / 1024**3, type=float, help='size limit of the result cache in GB')
+    parser.add_argument('--format', default='csv', choices=CONTOUR_FORMATS, help='csv or npy file per pose or one container for the whole scan')
+    args = parser.parse_args()
+    path_save = args.destination
+    windows = loadLaserWindows(args.windows) if args.windows else None
+    cache = ExtractionCache(args.cache_dir, int(args.cache_size * 1024**3)) if args.cache_dir else None
     
     # Find pictures in the specified folder and its subfolders
-    n_pictures, picture_paths = find_pictures_in_folder(path_source)
+    n_pictures, picture_paths = find_pictures_in_folder(args.source)
     print(f'Found {n_pictures} pictures in the specified folder and its subfolders.')
-    
-    for p in picture_paths:
-        # Extract line points from the image
-        points = extractLinePoints(p, roi, max_line_width, contrast_low, contrast_high)
-        y = points[0]
-        x = points[1]
-        # Save the extracted points to a CSV file
-        filename = p.split('\\')[-1].split('_')[0] + '_contour.csv'
-        destination = os.path.join(path_save, filename)
-        print(destination)
-        with open(filename, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            
-            # Write each row to the CSV file
-            for x, y in zip(x, y):
-                writer.writerow([x,y])
+    # The laser-off images are paired with the laser images in pose order
+    background_paths = find_pictures_in_folder(args.background)[1] if args.background else None
+    bayer = loadBayerFrame(args.source) if args.bayer else None
 
+    if args.stream or args.track:
+        # Read, extract and write concurrently, this loop is the writer stage
+        track_margin = args.track_margin if args.track else None
+        results = streamLinePoints(picture_paths, args.roi, args.max_line_width, args.contrast_low, args.contrast_high, backend=args.backend, queue_size=args.queue_size, track_margin=track_margin, windows=windows, pyramid=args.pyramid, mask_threshold=args.mask, debug_dir=args.debug_masked, cache=cache, backgrounds=background_paths, bayer=bayer)
+    else:
+        # Extract line points from all images in parallel
+        results = zip(picture_paths, extractBatch(picture_paths, args.roi, args.max_line_width, args.contrast_low, args.contrast_high, backend=args.backend, workers=args.workers, windows=windows, pyramid=args.pyramid, mask_threshold=args.mask, debug_dir=args.debug_masked, cache=cache, backgrounds=background_paths, bayer=bayer))
     
+    # Save the extracted points ([x, y] per point) in the selected format
+    container = ContourContainer(os.path.join(path_save, 'contours')) if args.format == 'container' else None
+    for p, lines in results:
+        name = poseName(p)
+        if container is not None:
+            container.append(name, lines.points)
+        elif args.format == 'npy':
+            writeContourNpy(os.path.join(path_save, name + '_contour.npy'), lines.points)
+        else:
+            writeContourCsv(os.path.join(path_save, name + '_contour.csv'), lines.points)
+    if container is not None:
+        container.close()
+        print(f"Saved the contours to '{container.base_path}.bin'.")
 
     # Visualize extracted points using OpenCV
     #img_cv = cv.imread(path)
@@ -0,0 +1,89 @@
+import json # Import json to decode the requests
+import struct # Import struct to encode the headers of the responses
+import socketserver # Import socketserver for the TCP server
+import threading # Import threading to shut the server down from a request
+import argparse # Import argparse for the command line interface
+from line_extraction import BACKENDS, getBackend, rowColArray, streamLinePoints
+from extraction_cache import ExtractionCache, DEFAULT_MAX_BYTES
+
+# Default port of the line extraction server
+DEFAULT_PORT = 50007
+
+class ExtractionRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles the requests of one client connection.
+
+    Every request is one line of JSON:
+        {"paths": [...], "roi": [row1, col1, row2, col2], "max_line_width": ..., "contrast_low": ...,
+         "contrast_high": ..., "light_dark": "light", "track_margin": null, "pyramid": null,
+         "mask_threshold": null, "background_paths": null}
+    or {"command": "shutdown"} to stop the server. The connection stays open for further requests.
+    With a mask_threshold the paths are undistorted colour images that are masked in memory (see maskLaserImage).
+    With background_paths (the laser-off image of every path) the differences of the laser on/off pairs are
+    extracted instead (see readDifference).
+
+    For every path the server answers in order with a little-endian int64 N followed by the 2 x N float64
+    points (all rows, then all columns) as returned by extractLinePoints. If the extraction fails, N is -1
+    followed by an int64 length and the UTF-8 error message.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            if request.get('command') == 'shutdown':
+                # shutdown() waits for serve_forever to return, so it must not block this handler
+                threading.Thread(target=self.server.shutdown).start()
+                return
+            self.extract(request)
+
+    def extract(self, request: dict):
+        paths = request['paths']
+        sent = 0
+        try:
+            for path, lines in streamLinePoints(paths, request['roi'], request['max_line_width'], request['contrast_low'], request['contrast_high'],
+                                                request.get('light_dark', 'light'), self.server.backend, verbose=False,
+                                                track_margin=request.get('track_margin'), pyramid=request.get('pyramid'), mask_threshold=request.get('mask_threshold'), cache=self.server.cache,
+                                                backgrounds=request.get('background_paths')):
+                self.sendPoints(rowColArray(lines))
+                sent += 1
+        except Exception as error:
+            # The client expects one answer per path
+            for _ in range(sent, len(paths)):
+                self.sendError(str(error))
+        self.wfile.flush()
+
+    def sendPoints(self, points):
+        self.wfile.write(struct.pack('<q', points.shape[1]))
+        self.wfile.write(points.astype('<f8', copy=False).tobytes())
+
+    def sendError(self, message: str):
+        encoded = message.encode('utf-8')
+        self.wfile.write(struct.pack('<qq', -1, len(encoded)))
+        self.wfile.write(encoded)
+
+class ExtractionServer(socketserver.TCPServer):
+    """TCP server that keeps the interpreter, the libraries and the extraction backend loaded between requests."""
+    allow_reuse_address = True
+
+    def __init__(self, port: int = DEFAULT_PORT, backend: str = 'auto', cache: ExtractionCache = None):
+        # Create the backend once, all requests share it (and the result cache, if any)
+        self.backend = getBackend(backend)
+        self.cache = cache
+        super().__init__(('127.0.0.1', port), ExtractionRequestHandler)
+
+
+# Start the server once per scan, e.g. python line_extraction_server.py --backend halcon
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serves line extraction requests on a local TCP port.')
+    parser.add_argument('--port', default=DEFAULT_PORT, type=int, help='TCP port on localhost')
+    parser.add_argument('--backend', default='auto', choices=['auto'] + list(BACKENDS), help='line extraction backend')
+    parser.add_argument('--cache-dir', default=None, help='folder of the result cache, unchanged images are not extracted again')
+    parser.add_argument('--cache-size', default=DEFAULT_MAX_BYTES / 1024**3, type=float, help='size limit of the result cache in GB')
+    args = parser.parse_args()
+
+    cache = ExtractionCache(args.cache_dir, int(args.cache_size * 1024**3)) if args.cache_dir else None
+    with ExtractionServer(args.port, args.backend, cache) as server:
+        print(f"Line extraction server ({server.backend.name}) listening on port {args.port}.")
+        server.serve_forever()
@@ -0,0 +1,49 @@
+from typing import NamedTuple
+import numpy as np
+
+class LinePoints(NamedTuple):
+    """
+    Line points found by a line detector, stored column-wise in compact float32 arrays.
+
+    Attributes:
+        points (np.ndarray): Point positions (N x 2, [x, y]) in pixels.
+        normals (np.ndarray): Unit normals of the line at the points (N x 2, [nx, ny]).
+        response (np.ndarray): Line strength at the points (N).
+        width (np.ndarray): Line width at the points (N) in pixels.
+        amplitude (np.ndarray): Contrast of the line against the background at the points (N) in grey values.
+        angle (np.ndarray): Angle of the normal at the points (N) in radians, measured like the 'angle'
+            attribute of HALCON (against the column axis, counter-clockwise with the row axis pointing down).
+    """
+    points: np.ndarray
+    normals: np.ndarray
+    response: np.ndarray
+    width: np.ndarray
+    amplitude: np.ndarray
+    angle: np.ndarray
+
+def makeLinePoints(points, normals, response, width, amplitude, angle=None) -> LinePoints:
+    # store every column as contiguous float32, the angle follows from the normals if it is not given
+    normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 2)
+    if angle is None:
+        angle = np.arctan2(-normals[:, 1], normals[:, 0])
+    return LinePoints(np.ascontiguousarray(points, dtype=np.float32).reshape(-1, 2),
+                      normals,
+                      np.ascontiguousarray(response, dtype=np.float32).reshape(-1),
+                      np.ascontiguousarray(width, dtype=np.float32).reshape(-1),
+                      np.ascontiguousarray(amplitude, dtype=np.float32).reshape(-1),
+                      np.ascontiguousarray(angle, dtype=np.float32).reshape(-1))
+
+def emptyLinePoints() -> LinePoints:
+    # result without any points
+    return makeLinePoints(np.zeros((0, 2)), np.zeros((0, 2)), [], [], [])
+
+def selectLinePoints(lines: LinePoints, keep) -> LinePoints:
+    # subset of the points given by a boolean mask or an index array
+    return LinePoints(*(np.ascontiguousarray(column[keep]) for column in lines))
+
+def concatLinePoints(parts) -> LinePoints:
+    # joins the points of several results (e.g. of image tiles) into one result
+    parts = list(parts)
+    if not parts:
+        return emptyLinePoints()
+    return LinePoints(*(np.concatenate(columns) for columns in zip(*parts)))
@@ -0,0 +1,110 @@
+# Scanline peak detection of a single laser stripe
+# Every scanline (image row or column) holds at most one stripe crossing, so the
+# stripe center is the refined intensity maximum of that scanline.
+
+import numpy as np
+import cv2
+from line_points import LinePoints, makeLinePoints
+
+# Available methods for the subpixel refinement of the peaks
+REFINE_METHODS = ('cog', 'parabola', 'gaussian')
+
+def gatherWindow(img, rows, peaks, half_window):
+    # intensities around the peak of every scanline (clamped at the image border)
+    offsets = np.arange(-half_window, half_window + 1)
+    cols = np.clip(peaks[:, None] + offsets, 0, img.shape[1] - 1)
+    return img[rows[:, None], cols].astype(np.float32), offsets
+
+def plateauRuns(img, rows, peaks, value, max_run):
+    # number of pixels equal to the maximum in the run starting at the peak (saturated stripes are flat on top)
+    offsets = np.arange(max_run)
+    cols = peaks[:, None] + offsets
+    inside = cols < img.shape[1]
+    equal = inside & (img[rows[:, None], np.minimum(cols, img.shape[1] - 1)] == value[:, None])
+    return np.cumprod(equal, axis=1).sum(axis=1)
+
+def refinePeaks(window, offsets, method):
+    # subpixel offset of the peak relative to the center of the window
+    center = len(offsets) // 2
+    if method == 'cog':
+        # center of gravity of the whole window
+        weight = window.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(weight > 0, (window * offsets).sum(axis=1) / weight, 0.0)
+        return offset
+    left = window[:, center - 1]
+    peak = window[:, center]
+    right = window[:, center + 1]
+    if method == 'gaussian':
+        # a parabola through the logarithm of the samples is exact for gaussian profiles
+        left, peak, right = np.log(np.maximum(left, 1.0)), np.log(np.maximum(peak, 1.0)), np.log(np.maximum(right, 1.0))
+    elif method != 'parabola':
+        raise ValueError(f"Unknown refinement method '{method}', expected one of {REFINE_METHODS}.")
+    denom = left - 2.0 * peak + right
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = np.where(denom < 0, 0.5 * (left - right) / denom, 0.0)
+    return np.clip(offset, -0.5, 0.5)
+
+def detectScanlinePeaks(img, threshold, half_window=10, method='cog', axis=1) -> LinePoints:
+    """
+    Detects the laser stripe center on every scanline of a (masked) grayscale image.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        threshold (float): Minimum peak intensity for a scanline to contain the stripe.
+        half_window (int, optional): Half size of the window around the peak used for refinement and width. Defaults to 10.
+        method (str, optional): Subpixel refinement, 'cog' (center of gravity), 'parabola' or 'gaussian'. Defaults to 'cog'.
+        axis (int, optional): 1 searches along the rows (vertical stripes), 0 along the columns (horizontal stripes). Defaults to 1.
+
+    Returns:
+        LinePoints: Positions ([x, y]), normals, peak intensities, widths (full width at half maximum), contrasts against
+            the darkest pixel of the window and normal angles as float32 arrays.
+    """
+    if img.ndim != 2:
+        raise ValueError('Scanline detection expects a single channel image.')
+    # searching along the columns is searching along the rows of the transposed image
+    if axis == 0:
+        img = img.T
+
+    # strongest pixel of every scanline
+    peaks = np.argmax(img, axis=1)
+    rows = np.arange(img.shape[0])
+    value = img[rows, peaks]
+    found = value >= threshold
+    rows, peaks, value = rows[found], peaks[found], value[found]
+
+    # argmax is the first pixel of a saturated plateau, so start the refinement at its middle
+    first = peaks
+    run = plateauRuns(img, rows, first, value, 2 * half_window + 1)
+    peaks = first + (run - 1) // 2
+
+    # refine the peaks and measure the width within a window around them
+    window, offsets = gatherWindow(img, rows, peaks, half_window)
+    offset = refinePeaks(window, offsets, method)
+    width = np.count_nonzero(window >= 0.5 * value[:, None], axis=1)
+    amplitude = value - window.min(axis=1)
+
+    # the stripe normal is the scan direction
+    center = peaks + offset
+    if method != 'cog':
+        # three samples of a plateau carry no curvature, its center is the middle of the run
+        plateau = run > 2
+        center[plateau] = first[plateau] + 0.5 * (run[plateau] - 1)
+    if axis == 0:
+        points = np.stack((rows, center), axis=1)
+        normals = np.tile(np.array([0.0, 1.0]), (len(rows), 1))
+    else:
+        points = np.stack((center, rows), axis=1)
+        normals = np.tile(np.array([1.0, 0.0]), (len(rows), 1))
+    return makeLinePoints(points, normals, value, width, amplitude)
+
+
+# Example usage of the detector on a single masked laser image
+if __name__ == "__main__":
+    import time
+
+    img = cv2.imread("C:/Users/Robin/OneDrive/University/Master/Masterarbeit/Kalibrierdaten/20240308-1738-calib_data/00_calib_laser_left.png", cv2.IMREAD_GRAYSCALE)
+
+    start = time.time()
+    lines = detectScanlinePeaks(img, threshold=30)
+    print(f'Found {len(lines.points)} points in {1000 * (time.time() - start):.1f} ms')
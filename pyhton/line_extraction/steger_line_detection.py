@@ -1,134 +1,404 @@
 # Steger algorithm for edge/line extraction
 # Author : Munch Quentin, 2020
- 
+
 # General and computer vision lib
 import numpy as np
 import cv2
-from matplotlib import pyplot as plt
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from line_points import LinePoints, makeLinePoints, concatLinePoints, selectLinePoints
+from extraction_params import MIN_CONTOUR_LENGTH, MAX_CONTOUR_LENGTH
 #from skimage.feature import hessian_matrix, hessian_matrix_eigvals
- 
+
+# identity kernel for the direction that is not filtered in a 1D pass
+IDENTITY_KERNEL = np.ones(1, dtype=np.float32)
+
+# default size in pixels of the tiles of detectLinesTiled (without halo)
+TILE_SIZE = 512
+
+# forward half of the 5x5 neighbourhood ([drow, dcol]), every pair of neighbours is visited once;
+# the second ring bridges the single pixel gaps left by the |T*n| <= 0.5 test
+LINK_OFFSETS = np.array([[drow, dcol] for drow in range(0, 3) for dcol in range(-2, 3) if drow > 0 or dcol > 0])
+# maximum angle between the normals of linked points in degrees
+LINK_MAX_ANGLE = 30.0
+# maximum ratio of the curvature along the line to the curvature across it, blobs curve alike in both directions
+MAX_EIGENVALUE_RATIO = 0.5
+
+@lru_cache(maxsize=None)
+def gaussianKernels(sigma):
+    # sampled 1D gaussian and its first and second derivative, built once per sigma
+    radius = int(np.ceil(4.0 * sigma))
+    u = np.arange(-radius, radius + 1, dtype=np.float64)
+    g0 = np.exp(-0.5 * (u / sigma)**2)
+    g0 /= g0.sum()
+    # cv2 filters correlate, so the odd first derivative kernel is mirrored (-g'(-u) = u/sigma^2 * g(u))
+    g1 = u / sigma**2 * g0
+    g1 /= np.sum(u * g1)  # slope of a ramp is 1
+    g2 = (u**2 / sigma**4 - 1.0 / sigma**2) * g0
+    g2 -= g2.sum() * g0  # flat image gives 0
+    g2 *= 2.0 / np.sum(u**2 * g2)  # curvature of a parabola is 2
+    return g0.astype(np.float32), g1.astype(np.float32), g2.astype(np.float32)
+
+def filterRows(img, kernel):
+    # 1D pass along x
+    return cv2.sepFilter2D(img, cv2.CV_32F, kernel, IDENTITY_KERNEL, borderType=cv2.BORDER_REFLECT)
+
+def filterCols(img, kernel):
+    # 1D pass along y
+    return cv2.sepFilter2D(img, cv2.CV_32F, IDENTITY_KERNEL, kernel, borderType=cv2.BORDER_REFLECT)
+
 def computeDerivative(img, sigma):
     # create filter for derivative calulation
-    
-
-
-    # compute derivative
-    dx = cv2.filter2D(img,-1, dxFilter)
-    dy = cv2.filter2D(img,-1, dyFilter)
-    dxx = cv2.filter2D(img,-1, dxxFilter)
-    dyy = cv2.filter2D(img,-1, dyyFilter)
-    dxy = cv2.filter2D(img,-1, dxyFilter)
-    return dx, dy, dxx, dyy
- 
-def computeMagnitudeAndPhase(dxx, dyy):
-    # convert to float
-    dxx = dxx.astype(float)
-    dyy = dyy.astype(float)
-    # calculate magnitude and phase
-    mag = cv2.magnitude(dxx, dyy)
-    phase = cv2.phase(dxx, dyy, angleInDegrees = True)
-    return mag, phase
- 
-def nonMaxSuppression(det, phase):
-    # gradient max init
-    gmax = np.zeros(det.shape)
-    # thin-out evry edge for angle = [0, 45, 90, 135]
-    for i in range(gmax.shape[0]):
-        for j in range(gmax.shape[1]):
-            if phase[i][j] < 0:
-                phase[i][j] += 360
-            if ((j+1) < gmax.shape[1]) and ((j-1) >= 0) and ((i+1) < gmax.shape[0]) and ((i-1) >= 0):
-                # 0 degrees
-                if (phase[i][j] >= 337.5 or phase[i][j] < 22.5) or (phase[i][j] >= 157.5 and phase[i][j] < 202.5):
-                    if det[i][j] >= det[i][j + 1] and det[i][j] >= det[i][j - 1]:
-                        gmax[i][j] = det[i][j]
-                # 45 degrees
-                if (phase[i][j] >= 22.5 and phase[i][j] < 67.5) or (phase[i][j] >= 202.5 and phase[i][j] < 247.5):
-                    if det[i][j] >= det[i - 1][j + 1] and det[i][j] >= det[i + 1][j - 1]:
-                        gmax[i][j] = det[i][j]
-                # 90 degrees
-                if (phase[i][j] >= 67.5 and phase[i][j] < 112.5) or (phase[i][j] >= 247.5 and phase[i][j] < 292.5):
-                    if det[i][j] >= det[i - 1][j] and det[i][j] >= det[i + 1][j]:
-                        gmax[i][j] = det[i][j]
-                # 135 degrees
-                if (phase[i][j] >= 112.5 and phase[i][j] < 157.5) or (phase[i][j] >= 292.5 and phase[i][j] < 337.5):
-                    if det[i][j] >= det[i - 1][j - 1] and det[i][j] >= det[i + 1][j + 1]:
-                        gmax[i][j] = det[i][j]
-    return gmax
- 
-def computeHessian(dx, dy, dxx, dyy, dxy):
-    # create empty list
-    point=[]
-    direction=[]
-    value=[]
-    # for the all image
-    for y in range(0, img.shape[0]): # line
-        for x in range(0, img.shape[1]): # column
-            # if superior to certain threshold
-            if dxy[y,x] > 10:
-                # compute local hessian
-                hessian = np.zeros((2,2))
-                hessian[0,0] = dxx[y,x]
-                hessian[0,1] = dxy[y,x]
-                hessian[1,0] = dxy[y,x]
-                hessian[1,1] = dyy[y,x]
-                # compute eigen vector and eigen value
-                ret, eigenVal, eigenVect = cv2.eigen(hessian)
-                if np.abs(eigenVal[0,0]) >= np.abs(eigenVal[1,0]):
-                    nx = eigenVect[0,0]
-                    ny = eigenVect[0,1]
-                else:
-                    nx = eigenVect[1,0]
-                    ny = eigenVect[1,1]
-                # calculate denominator for the taylor polynomial expension
-                denom = dxx[y,x]*nx*nx + dyy[y,x]*ny*ny + 2*dxy[y,x]*nx*ny
-                # verify non zero denom
-                if denom != 0:
-                    T = -(dx[y,x]*nx + dy[y,x]*ny)/denom
-                    # update point
-                    if np.abs(T*nx) <= 0.5 and np.abs(T*ny) <= 0.5:
-                        point.append((x,y))
-                        #point.append((x+T*nx,y+T*ny))
-                        direction.append((nx,ny))
-                        value.append(np.abs(dxy[y,x]+dxy[y,x]))
+    g0, g1, g2 = gaussianKernels(float(sigma))
+    # work in float so the derivatives of 8 bit images do not saturate
+    img = np.asarray(img, dtype=np.float32)
+    # horizontal passes, shared by the derivatives below
+    smooth = filterRows(img, g0)
+    rowDx = filterRows(img, g1)
+    rowDxx = filterRows(img, g2)
+    # compute derivative with the vertical passes
+    dx = filterCols(rowDx, g0)
+    dy = filterCols(smooth, g1)
+    dxx = filterCols(rowDxx, g0)
+    dyy = filterCols(smooth, g2)
+    dxy = filterCols(rowDx, g1)
+    return dx, dy, dxx, dyy, dxy
+
+def computeEigen(dxx, dyy, dxy):
+    # closed-form eigen decomposition of the symmetric hessian [[dxx, dxy], [dxy, dyy]],
+    # evaluated element-wise so it works on whole images as well as on point lists
+    halfTrace = 0.5 * (dxx + dyy)
+    root = np.sqrt((0.5 * (dxx - dyy))**2 + dxy**2)
+    eigenVal1 = halfTrace + root
+    eigenVal2 = halfTrace - root
+    # keep the eigenvalue with the largest absolute value (= direction of maximum curvature)
+    useFirst = np.abs(eigenVal1) >= np.abs(eigenVal2)
+    eigenVal = np.where(useFirst, eigenVal1, eigenVal2)
+    # eigenvector of eigenVal1 is (cos(theta), sin(theta)), the one of eigenVal2 is orthogonal to it
+    theta = 0.5 * np.arctan2(2.0 * dxy, dxx - dyy)
+    cos = np.cos(theta)
+    sin = np.sin(theta)
+    nx = np.where(useFirst, cos, -sin)
+    ny = np.where(useFirst, sin, cos)
+    return eigenVal, nx, ny
+
+def computeStrengthAndNormal(dxx, dyy, dxy, light_dark='light'):
+    # line strength and normal direction of every pixel
+    eigenVal, nx, ny = computeEigen(dxx, dyy, dxy)
+    # light lines have a strongly negative second derivative across the line, dark lines a positive one
+    strength = -eigenVal if light_dark == 'light' else eigenVal
+    return strength, nx, ny
+
+def interpolate(img, x, y):
+    # bilinear interpolation of img at the (float) positions x, y
+    x0 = np.clip(np.floor(x).astype(np.intp), 0, img.shape[1] - 2)
+    y0 = np.clip(np.floor(y).astype(np.intp), 0, img.shape[0] - 2)
+    fx = np.clip(x - x0, 0, 1)
+    fy = np.clip(y - y0, 0, 1)
+    top = img[y0, x0] * (1 - fx) + img[y0, x0 + 1] * fx
+    bottom = img[y0 + 1, x0] * (1 - fx) + img[y0 + 1, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+def nonMaxSuppression(det, nx, ny, threshold):
+    # only pixels superior to the threshold and off the image border are candidates
+    rows, cols = np.nonzero(det > threshold)
+    inner = (rows > 0) & (rows < det.shape[0] - 1) & (cols > 0) & (cols < det.shape[1] - 1)
+    rows = rows[inner]
+    cols = cols[inner]
+    # compare with the responses one pixel ahead and behind along the exact normal direction
+    value = det[rows, cols]
+    nxc = nx[rows, cols]
+    nyc = ny[rows, cols]
+    ahead = interpolate(det, cols + nxc, rows + nyc)
+    behind = interpolate(det, cols - nxc, rows - nyc)
+    isMax = (value >= ahead) & (value >= behind)
+    return rows[isMax], cols[isMax]
+
+def computeHessian(dx, dy, dxx, dyy, dxy, rows, cols, light_dark='light', subpixel=True):
+    # compute eigen vector and eigen value of the candidate pixels only
+    eigenVal, nx, ny = computeEigen(dxx[rows, cols], dyy[rows, cols], dxy[rows, cols])
+    # denominator of the taylor polynomial expansion (dxx*nx^2 + 2*dxy*nx*ny + dyy*ny^2) is the eigenvalue itself
+    with np.errstate(divide='ignore', invalid='ignore'):
+        T = -(dx[rows, cols]*nx + dy[rows, cols]*ny) / eigenVal
+    # the line center has to lie within the current pixel
+    inside = (np.abs(T*nx) <= 0.5) & (np.abs(T*ny) <= 0.5)
+    # the second eigenvalue (trace minus the first) is the curvature along the line, which is small on lines only
+    along = dxx[rows, cols] + dyy[rows, cols] - eigenVal
+    inside &= np.abs(along) <= MAX_EIGENVALUE_RATIO * np.abs(eigenVal)
+    rows, cols, nx, ny, T = rows[inside], cols[inside], nx[inside], ny[inside], T[inside]
+    if subpixel:
+        point = np.stack((cols + T*nx, rows + T*ny), axis=1)
+    else:
+        point = np.stack((cols, rows), axis=1)
+    direction = np.stack((nx, ny), axis=1)
+    value = -eigenVal[inside] if light_dark == 'light' else eigenVal[inside]
     return point, direction, value
- 
-# resize, grayscale and blurr
-img = cv2.imread("C:/Users/Robin/OneDrive/University/Master/Masterarbeit/Kalibrierdaten/20240308-1738-calib_data/00_calib_laser_left.png")
-gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
- 
-# blur the image
-#gray_img = cv2.GaussianBlur(gray_img, ksize=(0,0), sigmaX=0.8, sigmaY=0.8)
- 
-# compute derivative
-dx, dy, dxx, dyy = computeDerivative(gray_img, sigma=0.8)
- 
-normal, phase = computeMagnitudeAndPhase(dxx, dyy)
- 
-# compute thin-out image normal
-dxy = nonMaxSuppression(normal, phase)
-#dxy = normal
-pt, dir, val = computeHessian(dx, dy, dxx, dyy, dxy)
- 
-# take the first n max value
-nMax = 1000
-idx = np.argsort(val)
-idx = idx[::-1][:nMax]
-# plot resulting point
- 
-for i in range(0, len(idx)):
-    #img = cv2.circle(img, (pt[idx[i]][0], pt[idx[i]][1]), 1, (255, 0, 0), 1)
-    #img = cv2.circle(img, (pt[i][0], pt[i][1]), 1, (255, 0, 0), 1)  # no sorting
-    pval = img[pt[i][1]][pt[i][0]]
-    pval[0] = 255
-    pval[1] = 0
-    pval[2] = 0
-    img[pt[i][1]][pt[i][0]] = 255
- 
- 
-# plot the result
- 
-plt.imshow(img)
-#plt.imshow(dxy, cmap="gray", vmin=0, vmax=255)
-#plt.imshow(phase)
-plt.show()
\ No newline at end of file
+
+def computeWidth(dx, dy, point, direction, sigma, step=0.5):
+    # the line edges are the maxima of the gradient along the normal on both sides of the line
+    t = np.arange(step, 3.0 * sigma + step, step, dtype=np.float32)
+    nx = direction[:, 0, None]
+    ny = direction[:, 1, None]
+    width = np.zeros(len(point), dtype=np.float32)
+    for side in (1.0, -1.0):
+        x = point[:, 0, None] + side * t * nx
+        y = point[:, 1, None] + side * t * ny
+        grad = np.abs(interpolate(dx, x, y) * nx + interpolate(dy, x, y) * ny)
+        # refine the maximum with a parabola through its neighbours
+        i = np.clip(np.argmax(grad, axis=1), 1, len(t) - 2)[:, None]
+        left = np.take_along_axis(grad, i - 1, axis=1)
+        center = np.take_along_axis(grad, i, axis=1)
+        right = np.take_along_axis(grad, i + 1, axis=1)
+        denom = left - 2 * center + right
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(denom < 0, 0.5 * (left - right) / denom, 0.0)
+        width += (t[i[:, 0]] + np.clip(offset[:, 0], -0.5, 0.5) * step)
+    return width
+
+def computeAmplitude(value, width, sigma):
+    # invert the response of a bar profile: the second derivative at the center of a bar with
+    # half width w and contrast h is h * 2w / (sqrt(2 pi) sigma^3) * exp(-w^2 / (2 sigma^2))
+    halfWidth = np.maximum(0.5 * width, 0.5)
+    scale = 2.0 * halfWidth / (np.sqrt(2.0 * np.pi) * sigma**3) * np.exp(-0.5 * (halfWidth / sigma)**2)
+    return value / scale
+
+def detectLines(img, sigma, threshold, light_dark='light', subpixel=True) -> LinePoints:
+    """
+    Detects line points in a grayscale image with the Steger algorithm.
+
+    Parameters:
+        img (np.ndarray): Grayscale image.
+        sigma (float): Standard deviation of the gaussian used for the derivatives.
+        threshold (float): Minimum second derivative across the line for a point to be accepted.
+        light_dark (str, optional): Specifies if lines are lighter ('light') or darker ('dark') than the background. Defaults to 'light'.
+        subpixel (bool, optional): Returns the subpixel line centers instead of the integer pixel positions. Defaults to True.
+
+    Returns:
+        LinePoints: Positions ([x, y]), unit normals, line strengths, line widths, contrasts and normal angles of the
+            points as float32 arrays.
+    """
+    dx, dy, dxx, dyy, dxy = computeDerivative(img, sigma)
+    strength, nx, ny = computeStrengthAndNormal(dxx, dyy, dxy, light_dark)
+    # thin-out the response to the ridge candidates
+    rows, cols = nonMaxSuppression(strength, nx, ny, threshold)
+    point, direction, value = computeHessian(dx, dy, dxx, dyy, dxy, rows, cols, light_dark, subpixel)
+    width = computeWidth(dx, dy, point, direction, sigma)
+    return makeLinePoints(point, direction, value, width, computeAmplitude(value, width, sigma))
+
+
+def tileHalo(sigma):
+    # context a tile needs around its core: the filter radius plus the
+    # neighbours of the non-maximum suppression and the width search along the normal
+    return int(np.ceil(4.0 * sigma)) + int(np.ceil(3.0 * sigma)) + 2
+
+def detectTile(img, sigma, threshold, light_dark, subpixel, core, halo):
+    # detect the lines of one tile, keeping only the points whose pixel lies in the core of the tile
+    row0, col0, row1, col1 = core
+    top, left = max(row0 - halo, 0), max(col0 - halo, 0)
+    crop = img[top:min(row1 + halo, img.shape[0]), left:min(col1 + halo, img.shape[1])]
+    dx, dy, dxx, dyy, dxy = computeDerivative(crop, sigma)
+    strength, nx, ny = computeStrengthAndNormal(dxx, dyy, dxy, light_dark)
+    rows, cols = nonMaxSuppression(strength, nx, ny, threshold)
+    # every candidate pixel is owned by exactly one tile, so the halos do not produce duplicates
+    owned = (rows + top >= row0) & (rows + top < row1) & (cols + left >= col0) & (cols + left < col1)
+    point, direction, value = computeHessian(dx, dy, dxx, dyy, dxy, rows[owned], cols[owned], light_dark, subpixel)
+    width = computeWidth(dx, dy, point, direction, sigma)
+    return makeLinePoints(point + np.array([left, top], dtype=point.dtype), direction, value, width, computeAmplitude(value, width, sigma))
+
+def detectLinesTiled(img, sigma, threshold, light_dark='light', subpixel=True, tile_size=TILE_SIZE, workers=None) -> LinePoints:
+    """
+    Detects line points like detectLines, but filters the image in tiles on a thread pool.
+
+    Every tile is extended by a halo sized from sigma, so the points match those of detectLines. A point belongs
+    to the tile whose core contains its candidate pixel, which removes the duplicates of the halos deterministically.
+    The filters of OpenCV and NumPy release the GIL, so the latency of a single large frame scales with the cores.
+
+    Parameters:
+        img, sigma, threshold, light_dark, subpixel: See detectLines.
+        tile_size (int, optional): Size of the tile cores in pixels. Defaults to TILE_SIZE.
+        workers (int, optional): Number of threads. Defaults to None (the number of OpenCV threads, which is 1
+            in the worker processes of the batch mode).
+
+    Returns:
+        LinePoints: Positions ([x, y]) and attributes like detectLines, ordered by tile (row-major).
+    """
+    if workers is None:
+        workers = cv2.getNumThreads()
+    if workers <= 1 or (img.shape[0] <= tile_size and img.shape[1] <= tile_size):
+        return detectLines(img, sigma, threshold, light_dark, subpixel)
+
+    halo = tileHalo(sigma)
+    cores = [(row, col, min(row + tile_size, img.shape[0]), min(col + tile_size, img.shape[1]))
+             for row in range(0, img.shape[0], tile_size) for col in range(0, img.shape[1], tile_size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map keeps the order of the tiles, so the result does not depend on the scheduling
+        tiles = pool.map(lambda core: detectTile(img, sigma, threshold, light_dark, subpixel, core, halo), cores)
+        return concatLinePoints(tiles)
+
+
+def neighbourPairs(lines: LinePoints):
+    """
+    Finds all pairs of line points whose pixels are at most two pixels apart (LINK_OFFSETS).
+
+    Parameters:
+        lines (LinePoints): Line points, e.g. of detectLines.
+
+    Returns:
+        tuple: Indices of the first and the second point of every pair and the pixel step (row, col) between them.
+    """
+    n = len(lines.points)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, empty, empty
+    # linear index of the pixel of every point (the candidate pixel of the detection), the columns are padded
+    # by two pixels so that no offset wraps into the next row
+    pixel = np.round(lines.points[:, ::-1]).astype(np.int64)
+    pixel -= pixel.min(axis=0) - 2
+    stride = int(pixel[:, 1].max()) + 3
+    key = pixel[:, 0] * stride + pixel[:, 1]
+    # neighbours are looked up by binary search in the sorted indices, so the memory is linear in the number of points
+    order = np.argsort(key, kind='stable')
+    sortedKey = key[order]
+
+    first, second, rows, cols = [], [], [], []
+    for drow, dcol in LINK_OFFSETS:
+        target = key + (drow * stride + dcol)
+        position = np.minimum(np.searchsorted(sortedKey, target), n - 1)
+        i = np.flatnonzero(sortedKey[position] == target)
+        first.append(i)
+        second.append(order[position[i]])
+        rows.append(np.full(len(i), drow))
+        cols.append(np.full(len(i), dcol))
+    return np.concatenate(first), np.concatenate(second), np.concatenate(rows), np.concatenate(cols)
+
+def linkPairs(lines: LinePoints, pairs, max_angle=LINK_MAX_ANGLE):
+    """
+    Chains the neighbouring line points like Steger: every point is linked to at most one successor on either side
+    along its tangent, the candidate with the smallest distance plus normal angle, and a link needs the choice of both points.
+
+    Parameters:
+        lines (LinePoints): Line points, e.g. of detectLines.
+        pairs (tuple): Neighbouring points, see neighbourPairs.
+        max_angle (float, optional): Maximum angle between the normals of linked points in degrees. Defaults to LINK_MAX_ANGLE.
+
+    Returns:
+        tuple: Indices of the first and the second point of every link, every point has at most two links.
+    """
+    i, j = pairs[0], pairs[1]
+    # normals have no consistent sign, so only their angle counts
+    cosine = np.minimum(np.abs(np.sum(lines.normals[i] * lines.normals[j], axis=1)), 1.0)
+    # the step between the line centers has to follow the tangent, not the normal
+    step = lines.points[j] - lines.points[i]
+    distance = np.hypot(step[:, 0], step[:, 1])
+    along = np.abs(np.sum(lines.normals[i] * step, axis=1)) <= 0.75 * distance
+    keep = (cosine >= np.cos(np.radians(max_angle))) & along
+    i, j, step = i[keep], j[keep], step[keep]
+    cost = distance[keep] + np.arccos(cosine[keep])
+
+    # every pair is a candidate of both points, on the side of the tangent the other point lies on
+    source = np.concatenate((i, j))
+    target = np.concatenate((j, i))
+    step = np.concatenate((step, -step))
+    side = (step[:, 1] * lines.normals[source, 0] - step[:, 0] * lines.normals[source, 1]) > 0
+    cost = np.concatenate((cost, cost))
+    # best candidate per point and side
+    slot = 2 * source + side
+    order = np.lexsort((cost, slot))
+    best = order[np.unique(slot[order], return_index=True)[1]]
+    source, target = source[best], target[best]
+    # keep the links chosen by both points, once
+    n = len(lines.points)
+    chosen = source.astype(np.int64) * n + target
+    mutual = np.isin(target.astype(np.int64) * n + source, chosen) & (source < target)
+    return source[mutual], target[mutual]
+
+def contourComponents(n, first, second):
+    # the contours are the connected components of the links, so the linking is linear in the number of points
+    graph = coo_matrix((np.ones(len(first), dtype=np.int8), (first, second)), shape=(n, n))
+    return connected_components(graph, directed=False)
+
+def linkLines(lines: LinePoints, max_angle=LINK_MAX_ANGLE):
+    """
+    Links neighbouring line points into contours.
+
+    Parameters:
+        lines (LinePoints): Line points, e.g. of detectLines.
+        max_angle (float, optional): See linkPairs. Defaults to LINK_MAX_ANGLE.
+
+    Returns:
+        tuple: Number of contours and the contour label of every point.
+    """
+    n = len(lines.points)
+    if n == 0:
+        return 0, np.zeros(0, dtype=np.int32)
+    return contourComponents(n, *linkPairs(lines, neighbourPairs(lines), max_angle))
+
+def contourLengths(lines: LinePoints, labels, n_contours, first, second):
+    # the links form chains, so the length of a contour is the sum of the steps between its linked points
+    step = lines.points[second] - lines.points[first]
+    return np.bincount(labels[first], weights=np.hypot(step[:, 0], step[:, 1]), minlength=n_contours)
+
+def selectContours(lines: LinePoints, min_length=MIN_CONTOUR_LENGTH, max_length=MAX_CONTOUR_LENGTH, high=None, max_angle=LINK_MAX_ANGLE):
+    """
+    Links the line points into contours and keeps the contours within a length range, like
+    select_contours_xld(..., 'contour_length', min_length, max_length, ...) after lines_gauss.
+
+    Parameters:
+        lines (LinePoints): Line points, e.g. of detectLines with the low threshold.
+        min_length (float, optional): Minimum contour length in pixels. Defaults to MIN_CONTOUR_LENGTH.
+        max_length (float, optional): Maximum contour length in pixels. Defaults to MAX_CONTOUR_LENGTH.
+        high (float, optional): Hysteresis threshold, contours without a point of at least this strength are dropped. Defaults to None.
+        max_angle (float, optional): See linkPairs. Defaults to LINK_MAX_ANGLE.
+
+    Returns:
+        tuple: LinePoints of the kept contours, grouped by contour, and the contour label of every point (0 ... n-1).
+    """
+    if len(lines.points) == 0:
+        return lines, np.zeros(0, dtype=np.int32)
+    first, second = linkPairs(lines, neighbourPairs(lines), max_angle)
+    n_contours, labels = contourComponents(len(lines.points), first, second)
+    length = contourLengths(lines, labels, n_contours, first, second)
+    keepContour = (length >= min_length) & (length <= max_length)
+    if high is not None:
+        strongest = np.full(n_contours, -np.inf)
+        np.maximum.at(strongest, labels, lines.response)
+        keepContour &= strongest >= high
+    # renumber the kept contours and group their points, a stable sort keeps the order within the contours
+    newLabel = np.cumsum(keepContour) - 1
+    keep = np.flatnonzero(keepContour[labels])
+    keep = keep[np.argsort(labels[keep], kind='stable')]
+    return selectLinePoints(lines, keep), newLabel[labels[keep]].astype(np.int32)
+
+
+# Example usage of the detector on a single laser image
+if __name__ == "__main__":
+    from matplotlib import pyplot as plt
+    from extraction_params import planForResolution
+
+    # regression check: isolated speckles must not survive the contour selection with the parameters of 2592 x 2592 images (width 40)
+    params = planForResolution(2592)
+    for size in (5, 11):
+        speckle = np.zeros((256, 256), dtype=np.uint8)
+        speckle[128:128 + size, 128:128 + size] = 150
+        kept, _ = selectContours(detectLines(speckle, params.sigma, params.low), high=params.high)
+        assert len(kept.points) == 0, f'{len(kept.points)} points kept on a {size} x {size} speckle'
+
+    # resize, grayscale and blurr
+    img = cv2.imread("C:/Users/Robin/OneDrive/University/Master/Masterarbeit/Kalibrierdaten/20240308-1738-calib_data/00_calib_laser_left.png")
+    gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # line scale and threshold as used for lines_gauss in line_extraction.py
+    params = planForResolution(gray_img.shape[0])
+
+    # link the points into contours and drop short or weak ones
+    lines, labels = selectContours(detectLines(gray_img, params.sigma, params.low), high=params.high)
+
+    # plot resulting point
+    pt = np.round(lines.points).astype(int)
+    img[pt[:, 1], pt[:, 0]] = (255, 0, 0)
+
+    # plot the result
+    plt.imshow(img)
+    plt.show()
@@ -11,11 +11,17 @@ def create_scan_data_folder(base_path):
         "left/contour",
         "left/distorted",
         "left/masked",
+        "left/raw",
         "left/undistorted",
+        "left/background/distorted",
+        "left/background/raw",
+        "left/background/undistorted",
         "right/contour",
         "right/distorted",
         "right/masked",
         "right/undistorted",
+        "right/background/distorted",
+        "right/background/undistorted",
     ]
     
     # Iterate through the folder structure and create each path
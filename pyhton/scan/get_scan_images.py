@@ -3,13 +3,17 @@ import time
 import cv2
 import csv
 import os
+import sys
 import numpy as np
 from datetime import datetime
 from scipy.io import savemat
 from create_scan_data_folder import create_scan_data_folder
+from image_codec import write_image, save_metadata
 from picamera2 import Picamera2
 from libcamera import controls
 from gpiozero import LED
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'line_extraction'))
+from bayer import parseRawFormat, redPlane, mainStreamFrame, saveBayerFrame
 
 # Define paths for storing data
 cwd = os.getcwd()
@@ -43,6 +47,17 @@ capture_times = np.zeros((poses, 4))
 # Configure cameras
 capture_res = (2592, 2592)
 
+# Raw capture: only the red sites of the raw sensor frame of the left camera are saved as quarter-resolution
+# plane (left/raw, .npy), without demosaicing and colour conversion. The extraction maps the points into the
+# colour images (main stream) of the same configuration (line_extraction.py --bayer), they are still distorted
+# and have to be undistorted with the camera parameters of the calibration before the triangulation
+raw_capture = False
+
+# Codec of the saved images (png, tiff, bmp or npy, see image_codec.py) and its compression level,
+# e.g. png with level 0-1 or uncompressed tiff/bmp/npy if writing the images limits the scan speed
+image_codec = 'png'
+image_level = None
+
 picam0 = Picamera2(0)
 capture_config0 = picam0.create_still_configuration({"size": capture_res}, {"format": "BGR888"})
 picam0.configure(capture_config0)
@@ -50,7 +65,13 @@ picam0.set_controls({"AfMode": controls.AfModeEnum.Manual, "LensPosition": 8.0})
 picam0.start()
 
 picam1 = Picamera2(1)
-capture_config1 = picam1.create_still_configuration({"size": capture_res}, {"format": "BGR888"})
+if raw_capture:
+    # Unpacked raw stream (one uint16 per pixel) of the full sensor
+    raw_pattern, raw_bit_depth = parseRawFormat(picam1.sensor_format)
+    raw_size = picam1.sensor_resolution
+    capture_config1 = picam1.create_still_configuration({"size": capture_res}, raw={"format": picam1.sensor_format.split('_')[0], "size": raw_size})
+else:
+    capture_config1 = picam1.create_still_configuration({"size": capture_res}, {"format": "BGR888"})
 picam1.configure(capture_config1)
 picam1.set_controls({"AfMode": controls.AfModeEnum.Manual, "LensPosition": 8.0}) # focal distance is 1/10 m = 10cm
 picam1.start()
@@ -58,12 +79,43 @@ picam1.start()
 # Configure laser
 laser = LED(2)
 
+# Background subtraction: every pose also gets a laser-off frame (saved to left/background/distorted),
+# the extraction then works on the difference of the pair instead of the masked image
+background_subtraction = False
+# Frames dropped after switching the laser off, they may have been exposed while the laser was still on
+laser_settle_frames = 1
+
 # Open serial port
 ser = serial.Serial('/dev/ttyACM0', 115200, timeout=1)
 
 # Allow time for the serial connection to initialize
 time.sleep(2)
 
+# Record the capture settings, so the readers know the format of the images
+save_metadata(image_file_path, image_codec, image_level, capture_res=capture_res, raw_capture=raw_capture, background_subtraction=background_subtraction)
+
+# The planes are rotated like the colour images, the pattern of the rotated frame and the ScalerCrop of the
+# main stream map their points into the colour images the camera was calibrated with
+if raw_capture:
+    scaler_crop = picam1.capture_metadata()["ScalerCrop"]
+    active_size = picam1.camera_properties["PixelArrayActiveAreas"][0][2:]
+    bayer_frame = mainStreamFrame(raw_pattern, raw_size, active_size, scaler_crop, capture_res, rotations=1)
+    saveBayerFrame(os.path.join(image_file_path, 'left/raw'), bayer_frame, scaler_crop=scaler_crop, raw_size=raw_size, main_size=capture_res)
+    if background_subtraction:
+        saveBayerFrame(os.path.join(image_file_path, 'left/background/raw'), bayer_frame, scaler_crop=scaler_crop, raw_size=raw_size, main_size=capture_res)
+
+# Function for capturing an image of the left camera into the distorted (or raw) folder below folder
+def capture_left(folder, num):
+    if raw_capture:
+        raw = picam1.capture_array("raw").view(np.uint16)[:, :raw_size[0]]
+        plane, _ = redPlane(raw, raw_pattern, raw_bit_depth, rotations=1)
+        np.save(os.path.join(image_file_path, folder, 'raw', num + '_left_scan.npy'), plane)
+    else:
+        array1 = picam1.capture_array("main")
+        image1 = cv2.rotate(array1, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        image1 = cv2.cvtColor(image1, cv2.COLOR_RGB2BGR)
+        write_image(os.path.join(image_file_path, folder, 'distorted', num + '_left_scan'), image1, image_codec, image_level)
+
 # Function for reading angles
 def is_float(string):
     try:
@@ -110,7 +162,7 @@ try:
     picam0.set_controls({"AeEnable": False, "ExposureTime": 1000, "AnalogueGain": 1.0}) 
     picam1.set_controls({"AeEnable": False, "ExposureTime": 1000, "AnalogueGain": 1.0})
 
-    # Take pictures with laser on only       
+    # Take pictures with laser on only (switched off per pose for the laser-off frames)
     laser.on()
 
     # Iterate over each pose
@@ -180,11 +232,16 @@ try:
         #filename = os.path.join(image_file_path,num + '_right_laser.png')
         #cv2.imwrite(filename, image0) 
 
-        array1 = picam1.capture_array("main")
-        image1 = cv2.rotate(array1, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        image1 = cv2.cvtColor(image1, cv2.COLOR_RGB2BGR)
-        filename = os.path.join(image_file_path, 'left/distorted', num + '_left_scan.png')
-        cv2.imwrite(filename, image1) 
+        capture_left('left', num)
+
+        if background_subtraction:
+            # Laser-off frame of the same pose, only ambient light and reflections of other sources
+            laser.off()
+            for _ in range(laser_settle_frames):
+                picam1.capture_array("main")
+            capture_left('left/background', num)
+            # The laser settles while the motors move to the next pose
+            laser.on()
 
         # Measure time
         t_capture = time.time()
@@ -0,0 +1,60 @@
+import os
+import json
+import cv2
+import numpy as np
+
+# Lossless codecs of the captured images and their file extensions
+#   png   deflate compressed, level 0 (stored) to 9 (smallest), 0-1 are the fastest
+#   tiff  uncompressed (level 0) or LZW compressed (level > 0)
+#   bmp   uncompressed, no encoding cost
+#   npy   raw array (BGR), memory-mapped by the readers of the line extraction
+CODECS = {'png': '.png', 'tiff': '.tif', 'bmp': '.bmp', 'npy': '.npy'}
+DEFAULT_CODEC = 'png'
+
+# TIFF compression schemes of OpenCV
+TIFF_NONE = 1
+TIFF_LZW = 5
+
+# File in the root folder of a scan or calibration that records the codec of its images
+METADATA_FILE = 'metadata.json'
+
+def check_codec(codec):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown image codec '{codec}', expected one of {list(CODECS)}.")
+
+def write_image(path, image, codec=DEFAULT_CODEC, level=None):
+    # Saves an image under path (without extension) with the given codec and returns the file name
+    check_codec(codec)
+    filename = path + CODECS[codec]
+    if codec == 'npy':
+        np.save(filename, image)
+        return filename
+
+    params = []
+    if codec == 'png' and level is not None:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, int(level)]
+    elif codec == 'tiff':
+        params = [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_LZW if level else TIFF_NONE]
+    if not cv2.imwrite(filename, image, params):
+        raise IOError(f"Could not write image '{filename}'.")
+    return filename
+
+def save_metadata(folder, codec=DEFAULT_CODEC, level=None, **settings):
+    # Records the codec (and further capture settings) so the readers know the format of the images
+    check_codec(codec)
+    metadata = {'codec': codec, 'extension': CODECS[codec], 'level': level, **settings}
+    with open(os.path.join(folder, METADATA_FILE), mode='w') as file:
+        json.dump(metadata, file, indent=4)
+
+# Example usage: compare the write time and file size of all codecs for one image
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+
+    image = cv2.imread(sys.argv[1])
+    with tempfile.TemporaryDirectory() as folder:
+        for codec, level in [('png', None), ('png', 0), ('png', 1), ('tiff', 0), ('tiff', 1), ('bmp', None), ('npy', None)]:
+            start = time.time()
+            filename = write_image(os.path.join(folder, f'{codec}_{level}'), image, codec, level)
+            print(f'{codec} (level {level}): {1000 * (time.time() - start):.0f} ms, {os.path.getsize(filename) / 1024**2:.1f} MB')
@@ -0,0 +1,39 @@
+function [points, poseNames] = read_contour_container(basePath)
+%READ_CONTOUR_CONTAINER Reads the contour points of a whole scan from a binary container.
+%   The container is written by line_extraction.py (--format container) and consists of
+%   basePath.bin (float32 [x, y] pairs of all poses), basePath_offsets.bin (int64 offsets
+%   of the poses) and basePath_poses.txt (pose names). The points are memory-mapped, so
+%   only the points of the poses are read from disk.
+%
+%   Inputs:
+%       basePath - A string specifying the path of the container without extension.
+%
+%   Outputs:
+%       points - A cell array with an Nx2 array of [x, y] coordinates for every pose.
+%       poseNames - A cell array with the name of every pose.
+
+    % Offsets of the poses, pose i owns the points offsets(i)+1 to offsets(i+1)
+    fid = fopen(strcat(basePath, "_offsets.bin"), 'r');
+    offsets = fread(fid, Inf, 'int64=>double', 0, 'ieee-le');
+    fclose(fid);
+
+    % Pose names, one per line
+    poseNames = splitlines(string(fileread(strcat(basePath, "_poses.txt"))));
+
+    nPoses = length(offsets) - 1;
+    points = cell(nPoses, 1);
+
+    % memmapfile can not map an empty file
+    if offsets(end) == 0
+        points(:) = {zeros(0, 2)};
+        return;
+    end
+
+    % Map the points of all poses without reading the whole file
+    m = memmapfile(strcat(basePath, ".bin"), 'Format', {'single', [2, offsets(end)], 'xy'});
+    xy = m.Data.xy;
+
+    for i = 1:nPoses
+        points{i} = double(xy(:, offsets(i)+1:offsets(i+1)))';
+    end
+end
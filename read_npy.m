@@ -0,0 +1,54 @@
+function image = read_npy(filename)
+%READ_NPY Reads an image saved as .npy array by the capture scripts.
+%   The capture scripts can save the images as raw arrays (image_codec.py, codec
+%   "npy"), which are written in C order with the colour channels in BGR order.
+%   The image is returned like imread would return it, i.e. H x W x 3 in RGB order.
+%
+%   Inputs:
+%       filename - A string specifying the path of the .npy file.
+%
+%   Outputs:
+%       image - The image as uint8 (or uint16) array.
+
+    fid = fopen(filename, 'r');
+    cleanup = onCleanup(@() fclose(fid));
+
+    % Magic string, version and length of the header
+    magic = fread(fid, 6, 'uint8=>char')';
+    if ~strcmp(magic(2:end), 'NUMPY')
+        error("%s is not a .npy file.", filename);
+    end
+    version = fread(fid, 2, 'uint8');
+    if version(1) == 1
+        headerLength = fread(fid, 1, 'uint16', 0, 'ieee-le');
+    else
+        headerLength = fread(fid, 1, 'uint32', 0, 'ieee-le');
+    end
+    header = fread(fid, headerLength, 'uint8=>char')';
+
+    % Data type and shape from the header, e.g. {'descr': '|u1', 'fortran_order': False, 'shape': (2592, 2592, 3), }
+    descr = regexp(header, '''descr'':\s*''([^'']*)''', 'tokens', 'once');
+    shape = regexp(header, '''shape'':\s*\(([^\)]*)\)', 'tokens', 'once');
+    shape = str2double(strsplit(shape{1}, ','));
+    shape = shape(~isnan(shape));
+    switch descr{1}
+        case '|u1'
+            precision = 'uint8=>uint8';
+        case '<u2'
+            precision = 'uint16=>uint16';
+        otherwise
+            error("Unsupported data type %s of %s.", descr{1}, filename);
+    end
+    if contains(header, '''fortran_order'': True')
+        error("Fortran ordered arrays are not supported (%s).", filename);
+    end
+
+    % C order is the reversed MATLAB order
+    data = fread(fid, prod(shape), precision, 0, 'ieee-le');
+    image = permute(reshape(data, fliplr(shape)), numel(shape):-1:1);
+
+    % BGR to RGB
+    if ndims(image) == 3
+        image = image(:, :, end:-1:1);
+    end
+end
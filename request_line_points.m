@@ -0,0 +1,66 @@
+function points = request_line_points(imagePaths, roi, maxLineWidth, contrastLow, contrastHigh, port, maskThreshold, backgroundPaths)
+%REQUEST_LINE_POINTS Extracts line points of many images with the line extraction server.
+%   This function sends all image paths in one request to the persistent line extraction
+%   server (line_extraction_server.py), which has to be started once before, e.g. with
+%   "python line_extraction_server.py". Python, the libraries and the extraction backend are
+%   therefore loaded only once per scan instead of once per image.
+%
+%   Inputs:
+%       imagePaths - A cell array or string array of image paths.
+%       roi - A four-element vector [row1, col1, row2, col2] defining the region of interest.
+%       maxLineWidth - A scalar specifying the maximum width of the lines to be detected.
+%       contrastLow - A scalar defining the lower threshold for contrast filtering.
+%       contrastHigh - A scalar defining the upper threshold for contrast filtering.
+%       port - (Optional) TCP port of the server. Defaults to 50007.
+%       maskThreshold - (Optional) If given, imagePaths are undistorted colour images that the server
+%                       masks in memory like mask_images.m (threshold of channel 3, e.g. 112).
+%       backgroundPaths - (Optional) Laser-off image of every path. If given, the server extracts the
+%                         differences of the laser on/off pairs instead of masking the images.
+%
+%   Output:
+%       points - A cell array with an Nx2 array of [x, y] coordinates for every image.
+
+    if nargin < 6 || isempty(port)
+        port = 50007;
+    end
+
+    % Connect to the server (localhost only)
+    client = tcpclient("127.0.0.1", port, "Timeout", 600);
+
+    % Send one request for all images
+    request = struct("paths", {cellstr(imagePaths)}, ...
+                     "roi", roi, ...
+                     "max_line_width", maxLineWidth, ...
+                     "contrast_low", contrastLow, ...
+                     "contrast_high", contrastHigh, ...
+                     "light_dark", "light");
+    if nargin >= 7 && ~isempty(maskThreshold)
+        request.mask_threshold = maskThreshold;
+    end
+    if nargin >= 8
+        request.background_paths = cellstr(backgroundPaths);
+    end
+    writeline(client, jsonencode(request));
+
+    % The server answers with the point count and the 2xN array (rows first, columns second) of every image
+    nImages = numel(request.paths);
+    points = cell(nImages, 1);
+    for i = 1:nImages
+        nPoints = double(read(client, 1, "int64"));
+        if nPoints < 0
+            % Extraction failed, the error message follows
+            messageLength = double(read(client, 1, "int64"));
+            message = char(read(client, messageLength, "uint8"));
+            error("Line extraction failed for %s: %s", request.paths{i}, message);
+        end
+
+        if nPoints == 0
+            points{i} = zeros(0, 2);
+            continue;
+        end
+        pointsRowCol = reshape(read(client, 2 * nPoints, "double"), nPoints, 2);
+
+        % Combine x and y coordinates
+        points{i} = [pointsRowCol(:,2), pointsRowCol(:,1)];
+    end
+end
@@ -17,16 +17,17 @@ disp('Started camera calibration.');
 
 % Reading images from the specified path
 disp('Reading images from path...');
-distortedCheckerboardImages = imageDatastore(pathDistortedCheckerboard);
+% The images are stored in the codec recorded by get_calibration_images.py
+distortedCheckerboardImages = capture_datastore(pathDistortedCheckerboard, strcat(path, "metadata.json"));
 distortedCheckerboardImageFileNames = distortedCheckerboardImages.Files;
 
-distortedLaserImages = imageDatastore(pathDistortedLaser);
+distortedLaserImages = capture_datastore(pathDistortedLaser, strcat(path, "metadata.json"));
 distortedLaserImageFileNames = distortedLaserImages.Files;
 
 nPoses = length(distortedCheckerboardImages.Files); % Number of poses/images
 
 % Calibrate camera with distorted images
-[distortedCameraParams, imagesUsed, estimationErrors] = calibrate_camera(distortedCheckerboardImageFileNames, squareSize);
+[distortedCameraParams, imagesUsed, estimationErrors] = calibrate_camera(distortedCheckerboardImages, squareSize);
 disp([num2str(sum(imagesUsed)), '/', num2str(nPoses), ' patterns successfully detected.']);
 save(strcat(path,"distortedCameraParams.mat"), "distortedCameraParams"); % for undistorting scan images later
 
@@ -112,6 +113,11 @@ contrast_high = 60; % 10 orig
 contrast_low = 0.3 * contrast_high;
 roi = [0, 0, resolution, resolution];
 
+% Find the laser lines of all poses with one call into the Python binding,
+% unchanged images are loaded from the result cache
+extractionCacheDir = strcat(path, "left\" ,"laser\cache\");
+allPoints = extract_line_points_batch(maskedLaserImageFileNames, roi, max_line_width, contrast_low, contrast_high, [], extractionCacheDir);
+
 calibrationPoints = [];
 textprogressbar('Finding laser lines: ');
 for i = 1:nPoses
@@ -125,8 +131,8 @@ for i = 1:nPoses
     k = convhull(imagePointsNoNaNRows);
     hullPoints = imagePointsNoNaNRows(k, :);
 
-    % Find points in image
-    points = extract_line_points(maskedLaserImageFileNames(i), roi, max_line_width, contrast_low, contrast_high);
+    % Points in image
+    points = allPoints{i};
 
     % Only consider points within convex hull
     in = inpolygon(points(:,1), points(:,2), hullPoints(:,1), hullPoints(:,2));
@@ -163,5 +169,7 @@ planeParams = fit_plane(calibrationPoints);
 textprogressbar('done');
 
 % Save results
-save(strcat(path,"planeParams.mat"), "planeParams");
+% K is saved as well for the search windows of the line extraction (laser_windows.py)
+K = calibrationPoses(1).intrinsics.K;
+save(strcat(path,"planeParams.mat"), "planeParams", "K");
 disp('Finished laser plane calibration.');
\ No newline at end of file